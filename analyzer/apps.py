@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AnalyzerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyzer'
+
+    def ready(self):
+        # Connect signal receivers and register system checks
+        from . import cache, indexing, ingest, lookup, stats  # noqa: F401
@@ -0,0 +1,19 @@
+from django.urls import path
+from .async_views import (
+    AsyncAnagramsView, AsyncNaturalLanguageFilterView, AsyncSimilarStringsView, AsyncStringDetailView,
+    AsyncStringListCreateView,
+)
+from .views import CacheStatsView, PendingStringsView, StatsView
+
+# Same routes and names as analyzer.urls, served by the async views
+urlpatterns = [
+    path("strings/", AsyncStringListCreateView.as_view(), name="string-list-create"),
+    path("strings/filter-by-natural-language", AsyncNaturalLanguageFilterView.as_view(), name="natlang_filter"),
+    path("cache-stats", CacheStatsView.as_view(), name="cache_stats"),
+    path("ingest/pending", PendingStringsView.as_view(), name="pending_strings"),
+    path("ingest/pending/<str:string_id>", PendingStringsView.as_view(), name="pending_string"),
+    path("strings/stats", StatsView.as_view(), name="stats"),
+    path("strings/<path:string_value>/similar", AsyncSimilarStringsView.as_view(), name="similar_strings"),
+    path("strings/<path:string_value>/anagrams", AsyncAnagramsView.as_view(), name="anagrams"),
+    path("strings/<path:string_value>", AsyncStringDetailView.as_view(), name="detail_string"),
+]
@@ -0,0 +1,246 @@
+"""
+Async counterparts of the views in analyzer.views, for ASGI deployments
+(ANALYZER_ASYNC_VIEWS=True mounts them through analyzer.async_urls).
+
+They share the sync views' helpers (filter plans, row serializer, keyset
+pagination, response cache) but query through Django's async ORM, so one
+worker overlaps the database waits of many requests, and long strings are
+analyzed through analyzer.executor instead of on the event loop.
+Responses are rendered with DRF's JSONRenderer, so bodies match the sync
+views byte for byte.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import cache as response_cache
+from . import counting, engine, executor, idempotency, ingest, lookup, replicas, sharding
+from .filters import InvalidFilters, compile_plan
+from .models import AnalyzedString
+from .natlang import parse_natural_language_query
+from .pagination import KeysetPagination, ordering_key
+from .serializers import AnalyzedStringSerializer, CreateAnalyzeSerializer, StringRowSerializer
+from .views import (
+    STREAM_CHUNK_SIZE, StringListCreateView, anagram_data, applied_filters, bulk_create, create_string,
+    enqueue_string, page_cache_key, page_data, similar_data, wants_approximate, wants_stream,
+)
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(JSONRenderer().render(data), status=status_code, headers=headers,
+                        content_type="application/json")
+
+
+def invalid_filters_response(error):
+    if isinstance(error, InvalidFilters):
+        return json_response({"detail": "Invalid query parameters", "errors": error.errors},
+                             status.HTTP_400_BAD_REQUEST)
+    return json_response({"detail": "Invalid query parameter values or types", "error": str(error)},
+                         status.HTTP_400_BAD_REQUEST)
+
+
+def astream_ndjson(queryset, row_serializer):
+    """stream_ndjson() with an async iterator over the rows."""
+    rows = row_serializer.rows(queryset.order_by(*KeysetPagination.ordering))
+    build = row_serializer.item_builder()
+
+    async def lines():
+        shard_rows = [rows.using(alias).aiterator(chunk_size=STREAM_CHUNK_SIZE) for alias in sharding.shards()]
+        merged = shard_rows[0] if len(shard_rows) == 1 else sharding.amerge(shard_rows, ordering_key)
+        async for row in merged:
+            yield json.dumps(build(row)) + "\n"
+    return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
+
+async def aplan_page(request, plan, row_serializer):
+    """plan_page() using the async ORM."""
+    paginator = KeysetPagination()
+    key = await sync_to_async(page_cache_key)(request, plan, row_serializer, paginator)
+    use_cache = response_cache.enabled() and replicas.cached_reads_allowed()
+
+    page = await response_cache.afetch(key) if use_cache else None
+    cache_status = "HIT"
+    if page is None:
+        cache_status = "MISS"
+        queryset = plan.apply(AnalyzedString.objects.all())
+        rows = await paginator.apaginate_queryset(row_serializer.rows(queryset), request)
+        approximate = wants_approximate(request)
+        count, is_estimate = await sync_to_async(counting.plan_count)(plan, queryset, approximate)
+        page = {
+            "count": count,
+            "next_cursor": paginator.next_cursor,
+            "results": row_serializer.serialize(rows),
+        }
+        if approximate:
+            page["count_is_estimate"] = is_estimate
+        if use_cache:
+            await response_cache.astore(key, page)
+
+    return page_data(request, paginator, page), cache_status
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncStringListCreateView(View):
+    """Async StringListCreateView: GET lists/filters, POST creates (single or batch)."""
+    parsers = [parser() for parser in StringListCreateView.parser_classes]
+
+    async def get(self, request):
+        request = Request(request)  # for query_params, as the shared helpers expect
+        try:
+            plan = compile_plan(request.query_params)
+            row_serializer = StringRowSerializer.from_param(request.query_params.get("fields"))
+        except ValueError as e:
+            return invalid_filters_response(e)
+        try:
+            filters_applied = applied_filters(request.query_params)
+        except ValueError:
+            return json_response({"detail": "Invalid query parameter type"}, status.HTTP_400_BAD_REQUEST)
+
+        if wants_stream(request):
+            return astream_ndjson(plan.apply(AnalyzedString.objects.all()), row_serializer)
+
+        try:
+            page, cache_status = await aplan_page(request, plan, row_serializer)
+        except APIException as exc:  # NotFound for an invalid cursor, as DRF answers in the sync views
+            return json_response({"detail": exc.detail}, exc.status_code)
+        data = {
+            "count": page["count"],
+            "next": page["next"],
+            "filters_applied": filters_applied,
+            "results": page["results"],
+        }
+        if "count_is_estimate" in page:
+            data["count_is_estimate"] = page["count_is_estimate"]
+        return json_response(data, headers={"X-Cache": cache_status})
+
+    async def post(self, request):
+        request = Request(request, parsers=self.parsers)
+        try:
+            data = request.data
+        except APIException as exc:
+            return json_response({"detail": exc.detail}, exc.status_code)
+
+        if isinstance(data, list):
+            body, status_code = await sync_to_async(bulk_create)(data)
+            return json_response(body, status_code)
+
+        value = data.get("value")
+        if not isinstance(value, str):
+            return json_response({"detail": "Invalid data type for 'value' (must be string)"},
+                                 status.HTTP_422_UNPROCESSABLE_ENTITY)
+        serializer = CreateAnalyzeSerializer(data=data)
+        if not serializer.is_valid():
+            return json_response({"detail": "Invalid request", "errors": serializer.errors},
+                                 status.HTTP_400_BAD_REQUEST)
+
+        if ingest.enabled():
+            body, status_code = await sync_to_async(enqueue_string)(value)
+            return json_response(body, status_code)
+
+        # Only PlainTextParser produces these; anything a client sent is ignored
+        properties = data.get("properties")
+        if not isinstance(properties, engine.Properties):
+            properties = await executor.aanalyze(value)
+
+        body, status_code = await sync_to_async(create_string)(
+            value, properties, request.headers.get(idempotency.HEADER)
+        )
+        return json_response(body, status_code)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncStringDetailView(View):
+    """Async StringDetailView: GET and DELETE one string by value or hash."""
+
+    async def get(self, request, string_value):
+        pk = lookup.known_id(string_value)
+        cached = pk is not None and response_cache.enabled()
+        if cached:
+            data = await response_cache.afetch(response_cache.detail_key(pk))
+            if data is not None:
+                return json_response(data, headers={"X-Cache": "HIT"})
+
+        obj = await lookup.aget_by_value_or_hash(string_value)
+        if not obj:
+            return json_response({"detail": "String does not exist in the system."},
+                                 status.HTTP_404_NOT_FOUND)
+        data = AnalyzedStringSerializer(obj).data
+        if response_cache.enabled():
+            await response_cache.astore(response_cache.detail_key(obj.id), data)
+        return json_response(data, headers={"X-Cache": "MISS"} if cached else None)
+
+    async def delete(self, request, string_value):
+        obj = await lookup.aget_by_value_or_hash(string_value)
+        if not obj:
+            return json_response({"detail": "String does not exist in the system."},
+                                 status.HTTP_404_NOT_FOUND)
+        await obj.adelete()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncSimilarStringsView(View):
+    """Async SimilarStringsView; the candidate lookup runs in a worker thread."""
+
+    async def get(self, request, string_value):
+        data, status_code = await sync_to_async(similar_data)(string_value, request.GET)
+        return json_response(data, status_code)
+
+
+class AsyncAnagramsView(View):
+    """Async AnagramsView."""
+
+    async def get(self, request, string_value):
+        data, status_code = await sync_to_async(anagram_data)(string_value, request.GET)
+        return json_response(data, status_code)
+
+
+class AsyncNaturalLanguageFilterView(View):
+    """Async NaturalLanguageFilterView."""
+
+    async def get(self, request):
+        request = Request(request)
+        q = request.query_params.get("query")
+        if not q:
+            return json_response({"detail": "query parameter required"}, status.HTTP_400_BAD_REQUEST)
+        try:
+            parsed = parse_natural_language_query(q)
+            plan = compile_plan(parsed)
+        except ValueError:
+            return json_response({"detail": "Unable to parse natural language query"},
+                                 status.HTTP_400_BAD_REQUEST)
+        try:
+            row_serializer = StringRowSerializer.from_param(request.query_params.get("fields"))
+        except ValueError as e:
+            return invalid_filters_response(e)
+
+        if plan.has_conflict():
+            return json_response({"detail": "Query parsed but resulted in conflicting filters"},
+                                 status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        if wants_stream(request):
+            return astream_ndjson(plan.apply(AnalyzedString.objects.all()), row_serializer)
+
+        try:
+            page, cache_status = await aplan_page(request, plan, row_serializer)
+        except APIException as exc:  # NotFound for an invalid cursor, as DRF answers in the sync views
+            return json_response({"detail": exc.detail}, exc.status_code)
+        data = {
+            "data": page["results"],
+            "count": page["count"],
+            "next": page["next"],
+            "interpreted_query": {
+                "original": q,
+                "parsed_filters": parsed
+            }
+        }
+        if "count_is_estimate" in page:
+            data["count_is_estimate"] = page["count_is_estimate"]
+        return json_response(data, headers={"X-Cache": cache_status})
@@ -0,0 +1,45 @@
+"""
+Small helpers shared by the `bench_*` management commands.
+"""
+import random
+import string
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class Rollback(Exception):
+    """Raised to discard everything a benchmark wrote."""
+
+
+@contextmanager
+def rolled_back(using="default"):
+    """Run the block in a transaction that is always rolled back."""
+    try:
+        with transaction.atomic(using=using):
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+@contextmanager
+def timer(results, label):
+    """Store the wall-clock seconds spent in the block under `label`."""
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
+
+
+def random_strings(count, min_length=3, max_length=40, seed=0, alphabet=None):
+    """Return `count` distinct pseudo-random strings (words separated by spaces)."""
+    rng = random.Random(seed)
+    alphabet = alphabet or string.ascii_lowercase + "     "
+    seen = set()
+    while len(seen) < count:
+        length = rng.randint(min_length, max_length)
+        value = "".join(rng.choice(alphabet) for _ in range(length)).strip()
+        if value:
+            seen.add(value)
+    return list(seen)
@@ -0,0 +1,144 @@
+"""
+Read-through response cache for the analyzer API.
+
+Responses are stored in the Django cache named by ANALYZER_CACHE_ALIAS, so
+the backend (locmem, file, db, ...), TTL (TIMEOUT) and size bound
+(OPTIONS["MAX_ENTRIES"]) come from the CACHES setting.
+
+  - Detail responses are keyed by sha256 id. Rows never change after
+    save(), so they are only dropped when the row is deleted.
+  - List / natural-language responses are keyed by a normalized form of the
+    request plus a generation counter. Every create or delete bumps the
+    generation, which orphans all cached lists at once.
+"""
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .models import AnalyzedString
+from .signals import strings_created
+
+GENERATION_KEY = "analyzer:generation"
+HITS_KEY = "analyzer:hits"
+MISSES_KEY = "analyzer:misses"
+
+
+def enabled():
+    return getattr(settings, "ANALYZER_CACHE_ENABLED", True)
+
+
+def get_cache():
+    return caches[getattr(settings, "ANALYZER_CACHE_ALIAS", "default")]
+
+
+def _incr(key):
+    cache = get_cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Missing (or evicted) counter - start it; never expires
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def generation():
+    cache = get_cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        value = cache.get(GENERATION_KEY, 1)
+    return value
+
+
+def bump_generation():
+    _incr(GENERATION_KEY)
+
+
+def detail_key(pk):
+    return f"analyzer:detail:{pk}"
+
+
+def list_key(namespace, params):
+    """
+    Key for a list-style response. `params` is any JSON-serializable
+    description of the request; it is normalized so equivalent requests
+    share an entry.
+    """
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"analyzer:{namespace}:{generation()}:{digest}"
+
+
+def fetch(key):
+    """Return cached data for `key` or None, counting the hit or miss."""
+    data = get_cache().get(key)
+    _incr(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def store(key, data):
+    get_cache().set(key, data)
+
+
+# For async views: cache backends (file, db, ...) may block
+afetch = sync_to_async(fetch)
+astore = sync_to_async(store)
+alist_key = sync_to_async(list_key)
+
+
+def cached_response(key, build):
+    """
+    Serve `key` from the cache, or call `build()` to produce a Response
+    and cache its data if it is a 200.
+    """
+    if not enabled():
+        return build()
+
+    data = fetch(key)
+    if data is not None:
+        return Response(data, headers={"X-Cache": "HIT"})
+
+    response = build()
+    if response.status_code == 200:
+        store(key, response.data)
+        response["X-Cache"] = "MISS"
+    return response
+
+
+def stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "enabled": enabled(),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+        "generation": generation(),
+    }
+
+
+# Invalidate after commit so a concurrent read cannot re-cache
+# pre-commit data under the new generation.
+
+@receiver(strings_created)
+def invalidate_created(sender, instances, using, **kwargs):
+    transaction.on_commit(bump_generation, using=using)
+
+
+@receiver(post_delete, sender=AnalyzedString)
+def invalidate_deleted(sender, instance, using, **kwargs):
+    key = detail_key(instance.pk)  # the pk is cleared once delete() returns
+
+    def invalidate():
+        get_cache().delete(key)
+        bump_generation()
+    transaction.on_commit(invalidate, using=using)
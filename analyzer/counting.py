@@ -0,0 +1,114 @@
+"""
+Result counts for filtered listings.
+
+Exact counts are cached per canonical FilterPlan (under the response-cache
+generation, so any create or delete invalidates them); paging through a
+result set or changing `limit` no longer repeats the COUNT(*) scan.
+
+With approximate=true a count is estimated instead of computed:
+  1. From the StatBucket summary table when the plan only filters on
+     is_palindrome, length and word_count (exact for a single filter,
+     otherwise assuming the filters are independent).
+  2. From the optimizer's row estimate (EXPLAIN) on MySQL and PostgreSQL.
+  3. Otherwise (e.g. SQLite has no estimates) the cached exact count is used.
+"""
+import json
+
+from django.db import connections
+from django.db.models import Sum
+
+from . import cache as response_cache
+from . import replicas, sharding, stats
+from .models import StatBucket
+
+STATS_FILTERS = {"is_palindrome", "min_length", "max_length", "word_count"}
+
+
+def shard_count(queryset):
+    """COUNT(*) of `queryset` summed over the shards."""
+    return sum(sharding.fan_out(lambda alias: queryset.using(alias).count()))
+
+
+def exact_count(plan, queryset):
+    if not (response_cache.enabled() and replicas.cached_reads_allowed()):
+        return shard_count(queryset)
+    # Read the cache directly: hit/miss counters are about responses
+    cache = response_cache.get_cache()
+    key = response_cache.list_key("count", plan.cache_params())
+    count = cache.get(key)
+    if count is None:
+        count = shard_count(queryset)
+        cache.set(key, count)
+    return count
+
+
+def plan_count(plan, queryset, approximate=False):
+    """Return (count, is_estimate) for `queryset` (the result of `plan.apply()`)."""
+    if approximate:
+        estimate = estimate_from_stats(plan)
+        if estimate is None:
+            estimates = sharding.fan_out(lambda alias: estimate_from_explain(queryset.using(alias)))
+            estimate = None if None in estimates else sum(estimates)
+        if estimate is not None:
+            return estimate, True
+    return exact_count(plan, queryset), False
+
+
+def _bucket_total(kind, **key_filter):
+    # Every shard counts its own strings
+    return sum(
+        StatBucket.objects.using(alias).filter(kind=kind, **key_filter).aggregate(n=Sum("count"))["n"] or 0
+        for alias in sharding.shards()
+    )
+
+
+def estimate_from_stats(plan):
+    f = plan.filters
+    if not STATS_FILTERS.issuperset(f):
+        return None
+    total = _bucket_total(stats.STRINGS, key=0)
+    if not total:
+        return 0
+
+    estimate = float(total)
+    if "is_palindrome" in f:
+        estimate *= _bucket_total(stats.PALINDROME, key=int(f["is_palindrome"])) / total
+    if "min_length" in f or "max_length" in f:
+        length_range = {}
+        if "min_length" in f:
+            length_range["key__gte"] = f["min_length"]
+        if "max_length" in f:
+            length_range["key__lte"] = f["max_length"]
+        estimate *= _bucket_total(stats.LENGTH, **length_range) / total
+    if "word_count" in f:
+        estimate *= _bucket_total(stats.WORD_COUNT, key=f["word_count"]) / total
+    return round(estimate)
+
+
+def estimate_from_explain(queryset):
+    """The optimizer's estimate of the number of rows `queryset` returns, or None."""
+    connection = connections[queryset.db]
+    if connection.vendor not in ("mysql", "postgresql"):
+        return None
+    sql, params = queryset.values("pk").query.sql_with_params()
+    prefix = "EXPLAIN FORMAT=JSON " if connection.vendor == "mysql" else "EXPLAIN (FORMAT JSON) "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    if connection.vendor == "postgresql":
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return _mysql_rows(plan["query_block"])
+
+
+def _mysql_rows(block):
+    # The rows produced by the last table of the (possibly nested) join
+    if "table" in block:
+        return int(float(block["table"].get("rows_produced_per_join", 0)))
+    if "nested_loop" in block:
+        return _mysql_rows(block["nested_loop"][-1])
+    for key in ("ordering_operation", "grouping_operation", "duplicates_removal"):
+        if key in block:
+            return _mysql_rows(block[key])
+    return None
@@ -0,0 +1,163 @@
+"""
+String analysis engine.
+
+`analyze()` computes every stored property of one string using C-level
+primitives (str.lower, slicing, the Counter counting helper, str.split)
+instead of a per-character Python loop. Results are identical to the old
+loop, including the first-seen key order of character_frequency_map.
+
+Long texts (documents, log files) are analyzed window by window with
+StreamAnalyzer, so no lowercased or reversed copy of the whole text is made.
+"""
+try:
+    from collections import _count_elements
+except ImportError:  # not part of the public API; same thing through Counter
+    from collections import Counter
+
+    def _count_elements(mapping, iterable):
+        mapping.update(Counter(iterable))
+
+# Texts longer than this are analyzed in windows of WINDOW_SIZE characters
+LONG_TEXT_THRESHOLD = 64 * 1024
+WINDOW_SIZE = 16 * 1024
+
+# Characters whose lowercase form depends on context (final sigma) or changes
+# the length (dotted I), so lowering window by window is not equivalent to
+# lowering the whole text. Texts containing them use the whole-text path.
+CONTEXT_CASE_CHARS = frozenset("\u03a3\u0130")  # Σ, İ
+
+
+class Properties:
+    """Computed properties of one string."""
+    __slots__ = ("length", "is_palindrome", "unique_characters", "word_count", "character_frequency_map")
+
+    def __init__(self, length, is_palindrome, unique_characters, word_count, character_frequency_map):
+        self.length = length
+        self.is_palindrome = is_palindrome
+        self.unique_characters = unique_characters
+        self.word_count = word_count
+        self.character_frequency_map = character_frequency_map
+
+    def as_tuple(self):
+        return (self.length, self.is_palindrome, self.unique_characters,
+                self.word_count, self.character_frequency_map)
+
+    def __eq__(self, other):
+        return isinstance(other, Properties) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return (f"Properties(length={self.length}, is_palindrome={self.is_palindrome}, "
+                f"unique_characters={self.unique_characters}, word_count={self.word_count})")
+
+
+def analyze(text):
+    """Analyze one string (case-insensitive palindrome and character counts)."""
+    if len(text) > LONG_TEXT_THRESHOLD:
+        analyzer = StreamAnalyzer()
+        for start in range(0, len(text), WINDOW_SIZE):
+            analyzer.feed(text[start:start + WINDOW_SIZE])
+        return analyzer.result(text)
+    return _analyze_whole(text)
+
+
+def _analyze_whole(text):
+    text_lower = text.lower()
+    freq = {}
+    _count_elements(freq, text_lower)  # C loop; keys in first-seen order
+    return Properties(
+        length=len(text),
+        is_palindrome=text_lower == text_lower[::-1],
+        unique_characters=len(freq),
+        word_count=len(text.split()),
+        character_frequency_map=freq,
+    )
+
+
+def analyze_batch(texts):
+    """Analyze many strings; returns a list of Properties in input order."""
+    return list(map(analyze, texts))
+
+
+# Compact form for sending results between processes: plain tuples pickle
+# smaller and faster than Properties objects or dicts.
+#   (length, is_palindrome, word_count, "".join(frequency keys), counts)
+
+def analyze_compact(text):
+    props = analyze(text)
+    freq = props.character_frequency_map
+    return (props.length, props.is_palindrome, props.word_count, "".join(freq), tuple(freq.values()))
+
+
+def analyze_compact_batch(texts):
+    return [analyze_compact(text) for text in texts]
+
+
+def from_compact(compact):
+    """Rebuild Properties from analyze_compact() output."""
+    length, is_palindrome, word_count, chars, counts = compact
+    return Properties(
+        length=length,
+        is_palindrome=is_palindrome,
+        unique_characters=len(chars),
+        word_count=word_count,
+        character_frequency_map=dict(zip(chars, counts)),
+    )
+
+
+def is_palindrome_windowed(text, window=WINDOW_SIZE):
+    """
+    Case-insensitive palindrome check comparing mirrored windows of `text`,
+    so at most two windows are lowercased at a time.
+    Only valid when `text` has no CONTEXT_CASE_CHARS.
+    """
+    n = len(text)
+    half = n // 2
+    for start in range(0, half, window):
+        stop = min(start + window, half)
+        if text[start:stop].lower() != text[n - stop:n - start].lower()[::-1]:
+            return False
+    return True
+
+
+class StreamAnalyzer:
+    """
+    Incremental analysis of text arriving in chunks (e.g. a request body).
+
+    feed() updates the length, word count and frequency map per chunk,
+    carrying word boundaries across chunks. result() needs the full text
+    only for the palindrome check, done with mirrored windows.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.word_count = 0
+        self.frequencies = {}
+        self._in_word = False  # previous chunk ended inside a word
+        self._windowed = True
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        self.length += len(chunk)
+        if self._windowed and not CONTEXT_CASE_CHARS.isdisjoint(chunk):
+            self._windowed = False
+        if self._windowed:
+            _count_elements(self.frequencies, chunk.lower())
+
+        words = len(chunk.split())
+        if words and self._in_word and not chunk[0].isspace():
+            words -= 1  # the word continues from the previous chunk
+        self.word_count += words
+        self._in_word = not chunk[-1].isspace()
+
+    def result(self, text):
+        """Properties of `text`, which must be the concatenation of the fed chunks."""
+        if not self._windowed:
+            return _analyze_whole(text)
+        return Properties(
+            length=self.length,
+            is_palindrome=is_palindrome_windowed(text),
+            unique_characters=len(self.frequencies),
+            word_count=self.word_count,
+            character_frequency_map=self.frequencies,
+        )
@@ -0,0 +1,119 @@
+"""
+Where string analysis runs.
+
+Analysis is pure CPU work: done inline, a long string or a big batch holds
+the GIL (and, in async views, the event loop) for its whole duration.
+ANALYZER_EXECUTOR picks where large inputs go instead:
+
+  - "inline":  always in the calling thread.
+  - "thread":  a thread pool, for async views only; it keeps the event loop
+               free, while sync callers would just wait on the thread.
+  - "process": a process pool, for sync and async callers; workers run in
+               parallel with the web workers.
+
+Only strings longer than ANALYZER_INLINE_MAX_LENGTH and batches of at least
+ANALYZER_OFFLOAD_MIN_BATCH strings are offloaded; smaller inputs are cheaper
+to analyze than to hand over. Pools have ANALYZER_ANALYSIS_WORKERS workers.
+Process workers return engine.analyze_compact() tuples to keep pickling
+cheap.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from . import engine
+
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def executor_kind():
+    kind = getattr(settings, "ANALYZER_EXECUTOR", "thread")
+    if kind not in EXECUTOR_KINDS:
+        raise ImproperlyConfigured(f"ANALYZER_EXECUTOR must be one of {', '.join(EXECUTOR_KINDS)}")
+    return kind
+
+
+def workers():
+    return getattr(settings, "ANALYZER_ANALYSIS_WORKERS", 4)
+
+
+def get_executor(kind=None):
+    """The shared pool for `kind` ("thread" or "process"), created on first use."""
+    kind = kind or executor_kind()
+    key = (kind, workers())
+    with _pools_lock:
+        if key not in _pools:
+            if kind == "process":
+                # spawn: workers only import analyzer.engine, never inherit
+                # the parent's threads or database connections
+                _pools[key] = ProcessPoolExecutor(max_workers=key[1], mp_context=multiprocessing.get_context("spawn"))
+            else:
+                _pools[key] = ThreadPoolExecutor(max_workers=key[1], thread_name_prefix="analyzer")
+        return _pools[key]
+
+
+def _discard(kind):
+    with _pools_lock:
+        _pools.pop((kind, workers()), None)
+
+
+def offloads_text(text):
+    return len(text) > getattr(settings, "ANALYZER_INLINE_MAX_LENGTH", 4096)
+
+
+def offloads_batch(texts):
+    return (len(texts) >= getattr(settings, "ANALYZER_OFFLOAD_MIN_BATCH", 256)
+            or any(map(offloads_text, texts)))
+
+
+def _chunks(texts):
+    size = -(-len(texts) // workers())  # one chunk per worker
+    return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+
+def analyze(text):
+    """engine.analyze(text) for sync callers, in a worker process if configured."""
+    if executor_kind() != "process" or not offloads_text(text):
+        return engine.analyze(text)
+    try:
+        return engine.from_compact(get_executor("process").submit(engine.analyze_compact, text).result())
+    except BrokenProcessPool:
+        _discard("process")
+        return engine.analyze(text)
+
+
+def analyze_batch(texts):
+    """engine.analyze_batch(texts) for sync callers, split across worker processes if configured."""
+    texts = list(texts)
+    if executor_kind() != "process" or not offloads_batch(texts):
+        return engine.analyze_batch(texts)
+    try:
+        chunks = get_executor("process").map(engine.analyze_compact_batch, _chunks(texts))
+        return [engine.from_compact(compact) for chunk in chunks for compact in chunk]
+    except BrokenProcessPool:
+        _discard("process")
+        return engine.analyze_batch(texts)
+
+
+async def aanalyze(text):
+    """engine.analyze(text) for async views, off the event loop unless inline."""
+    kind = executor_kind()
+    if kind == "inline" or not offloads_text(text):
+        return engine.analyze(text)
+    loop = asyncio.get_running_loop()
+    if kind == "thread":
+        return await loop.run_in_executor(get_executor("thread"), engine.analyze, text)
+    try:
+        compact = await loop.run_in_executor(get_executor("process"), engine.analyze_compact, text)
+    except BrokenProcessPool:
+        _discard("process")
+        return engine.analyze(text)
+    return engine.from_compact(compact)
@@ -1,9 +1,36 @@
 from django_filters import rest_framework as filters
 from django.db import models
 from django.core.exceptions import ValidationError
+import re
 from .models import AnalyzedString
+from .plan import FilterPlan
 from django.db import connection
 from django.db.models import Q
+
+# char_count[<char>] or char_count[<char>]__<op>, e.g. char_count[e]__gte=3
+CHAR_COUNT_PARAM_RE = re.compile(r"char_count\[(.)\](?:__(gte|gt|lte|lt|exact))?$")
+
+
+class InvalidFilters(ValueError):
+    """Raised when query params fail AnalyzedStringFilter validation."""
+
+    def __init__(self, errors):
+        super().__init__("Invalid query parameters")
+        self.errors = errors
+
+
+def compile_plan(data):
+    """
+    Validate filter params (a QueryDict or a plain dict, e.g. parsed natural
+    language) with AnalyzedStringFilter and compile them into a FilterPlan.
+    Raises InvalidFilters for form errors and ValueError for bad values.
+    """
+    filterset = AnalyzedStringFilter(data, queryset=AnalyzedString.objects.none())
+    if not filterset.is_valid():
+        raise InvalidFilters(filterset.errors)
+    return filterset.plan()
+
+
 class AnalyzedStringFilter(filters.FilterSet):
     """
     FilterSet for AnalyzedString.
@@ -14,49 +41,55 @@ class AnalyzedStringFilter(filters.FilterSet):
       - max_length (int)
       - word_count (int)
       - contains_character (single char)  <- validated
+      - min_char_count ("<char>:<n>", e.g. "e:3")
+      - contains_all (e.g. "abc": every character present)
+      - contains_any (e.g. "xyz": at least one character present)
+      - char_count[<char>][__gte|__gt|__lte|__lt|__exact] (int), e.g. char_count[e]__gte=3
+      - contains / startswith / endswith (case-insensitive substring, prefix, suffix)
+      - is_anagram_of (same letters and digits, ignoring case, spaces and punctuation)
     """
+    # Declared filters parse and validate the params; filter_queryset compiles
+    # them into a FilterPlan, which does the actual filtering.
     is_palindrome = filters.BooleanFilter(field_name="is_palindrome")
     min_length = filters.NumberFilter(field_name="length", lookup_expr="gte")
     max_length = filters.NumberFilter(field_name="length", lookup_expr="lte")
     word_count = filters.NumberFilter(field_name="word_count", lookup_expr="exact")
-    contains_character = filters.CharFilter(method="filter_contains_char")
+    contains_character = filters.CharFilter()
+    min_char_count = filters.CharFilter()
+    contains_all = filters.CharFilter()
+    contains_any = filters.CharFilter()
+    contains = filters.CharFilter(strip=False)
+    startswith = filters.CharFilter(strip=False)
+    endswith = filters.CharFilter(strip=False)
+    is_anagram_of = filters.CharFilter()
 
     class Meta:
         model = AnalyzedString
-        fields = ["is_palindrome", "min_length", "max_length", "word_count", "contains_character"]
+        fields = ["is_palindrome", "min_length", "max_length", "word_count", "contains_character", "min_char_count",
+                  "contains_all", "contains_any", "contains", "startswith", "endswith", "is_anagram_of"]
+
+    def filter_queryset(self, queryset):
+        return self.plan().apply(queryset)
 
-    def filter_contains_char(self, queryset, name, value):
+    def plan(self):
         """
-        Filter for a single character contained in the character_frequency_map.
+        Compile the validated params into a FilterPlan.
 
-        Behavior:
-          - If value is not a single character, raise ValueError (caught by view -> 400).
-          - Prefer JSON key lookup when supported by the DB/Django.
-          - Fall back to searching the `value` text (less precise / slower) if JSON lookup is not available.
+        Raises ValueError (caught by the views -> 400) for values the form
+        does not check, e.g. a contains_character longer than one character.
         """
-        # Validate input: must be a single character
-        if value is None:
-            raise ValueError("contains_character parameter is required")
-        value = str(value)
-        if len(value) != 1:
-            raise ValueError("contains_character must be a single character")
-
-        ch = value
-
-        # Detect JSONField on model
-        field = queryset.model._meta.get_field("character_frequency_map")
-        is_json_field = field.get_internal_type() in ("JSONField", "JSONBField")
-
-        # Try DB-backed JSON key lookup if possible
-        if is_json_field:
-            # For Postgres and modern Django, has_key lookup is supported:
+        char_counts = [(ch, op, n) for _, ch, op, n in self.char_count_params(self.data)]
+        return FilterPlan.from_values(self.form.cleaned_data, char_counts)
+
+    @staticmethod
+    def char_count_params(data):
+        """Yield (param, char, op, n) for every char_count[...] param in `data`."""
+        for key in data:
+            m = CHAR_COUNT_PARAM_RE.match(key)
+            if not m:
+                continue
             try:
-                return queryset.filter(character_frequency_map__has_key=ch)
-            except Exception:
-                # fallback to other approaches below
-                pass
-
-        # If JSON lookups aren't supported for your DB, fallback to searching the raw value.
-        # This is less precise — it checks whether the original string contains the char.
-        # Document this behaviour in README.
-        return queryset.filter(value__contains=ch)
\ No newline at end of file
+                n = int(data[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be an integer")
+            yield key, m.group(1), m.group(2) or "exact", n
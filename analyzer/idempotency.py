@@ -0,0 +1,39 @@
+"""
+Idempotency-Key support for POST /strings/.
+
+A create that carries an Idempotency-Key header is safe to retry: if the
+string already exists (created by an earlier attempt, or by a concurrent
+one) the response is 200 with the stored string instead of 409. Each key
+is remembered with the id of the value it was first sent with, for
+ANALYZER_IDEMPOTENCY_TTL seconds, in the analyzer cache (see
+analyzer.cache); reusing a key for a different value is rejected with 422.
+Keys are claimed with cache.add(), so concurrent requests agree on the
+owner of a key. Use a shared cache backend (file, db) when running several
+processes.
+"""
+import hashlib
+
+from django.conf import settings
+
+from .cache import get_cache
+
+HEADER = "Idempotency-Key"
+
+
+def ttl():
+    return getattr(settings, "ANALYZER_IDEMPOTENCY_TTL", 24 * 3600)
+
+
+def _cache_key(key):
+    return "analyzer:idempotency:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def claim(key, string_id):
+    """
+    Tie `key` to `string_id` unless it is already tied to another id.
+    Returns False when the key was used for a different value.
+    """
+    cache = get_cache()
+    if cache.add(_cache_key(key), string_id, timeout=ttl()):
+        return True
+    return cache.get(_cache_key(key), string_id) == string_id
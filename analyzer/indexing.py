@@ -0,0 +1,41 @@
+"""
+Maintenance of the derived index tables.
+
+New strings arrive through `AnalyzedString.save()` or the batch path in
+`AnalyzedStringManager.bulk_analyze()`; both send `strings_created` inside
+the inserting transaction, so the index rows commit (or roll back) together
+with the strings. Deletes are handled by the foreign-key cascade.
+"""
+from django.dispatch import receiver
+
+from .models import CharacterOccurrence, SimilarityBand, Trigram
+from .signals import strings_created
+
+INDEX_BATCH_SIZE = 2000
+
+
+@receiver(strings_created)
+def index_characters(sender, instances, using, **kwargs):
+    CharacterOccurrence.objects.using(using).bulk_create(
+        CharacterOccurrence.for_strings(instances),
+        batch_size=INDEX_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+@receiver(strings_created)
+def index_trigrams(sender, instances, using, **kwargs):
+    Trigram.objects.using(using).bulk_create(
+        Trigram.for_strings(instances),
+        batch_size=INDEX_BATCH_SIZE,
+        ignore_conflicts=True,  # grams that differ only by case under a _ci collation
+    )
+
+
+@receiver(strings_created)
+def index_similarity_bands(sender, instances, using, **kwargs):
+    SimilarityBand.objects.using(using).bulk_create(
+        SimilarityBand.for_strings(instances),
+        batch_size=INDEX_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
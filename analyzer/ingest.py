@@ -0,0 +1,116 @@
+"""
+Write-behind ingest queue for POST /strings/.
+
+With ANALYZER_ASYNC_INGEST=True a single-string POST only validates and
+hashes the value, appends it to a queue and answers 202 with its sha256 id;
+the ingest_worker management command drains the queue in batches through
+AnalyzedString.objects.bulk_analyze(). Request latency no longer includes
+the analysis or a database commit, and bursts become a few large inserts.
+
+The queue is a local SQLite file (ANALYZER_INGEST_QUEUE_PATH) in WAL mode
+with full fsync, so an accepted value survives a crash and no broker is
+needed; web processes and the worker must share the file (same host).
+Entries are removed only after their batch is committed, so delivery is
+at-least-once: a batch interrupted by a crash is inserted again and its
+rows come out as duplicates. Each id is queued at most once at a time.
+GET /ingest/pending lists what is still waiting.
+
+The worker invalidates cached responses (see analyzer.cache) from its own
+process, so the response cache must be shared with the web processes; a
+system check rejects a locmem cache while async ingest is on.
+"""
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import cache as response_cache
+
+_local = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_queue (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    string_id TEXT NOT NULL UNIQUE,
+    value TEXT NOT NULL,
+    enqueued_at REAL NOT NULL
+)
+"""
+
+
+def enabled():
+    return getattr(settings, "ANALYZER_ASYNC_INGEST", False)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if not enabled() or not response_cache.enabled():
+        return []
+    if isinstance(response_cache.get_cache(), LocMemCache):
+        return [checks.Error(
+            "ANALYZER_ASYNC_INGEST needs a response cache shared with the ingest worker.",
+            hint="Set ANALYZER_CACHE_BACKEND to file or db; with locmem the web processes "
+                 "keep serving cached lists that miss the strings the worker stored.",
+            obj="analyzer.ingest",
+            id="analyzer.E001",
+        )]
+    return []
+
+
+def queue_path():
+    return str(getattr(settings, "ANALYZER_INGEST_QUEUE_PATH", settings.BASE_DIR / "ingest_queue.sqlite3"))
+
+
+def _connection():
+    # One connection per thread and queue file; sqlite3 connections are not
+    # shared between threads
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    path = queue_path()
+    if path not in connections:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute(SCHEMA)
+        connections[path] = conn
+    return connections[path]
+
+
+def enqueue(string_id, value):
+    """Queue `value` (already validated) under its sha256 id; a no-op if it is already queued."""
+    _connection().execute(
+        "INSERT OR IGNORE INTO ingest_queue (string_id, value, enqueued_at) VALUES (?, ?, ?)",
+        (string_id, value, time.time()),
+    )
+
+
+def next_batch(size):
+    """The oldest `size` entries as [(seq, value)], without removing them."""
+    return _connection().execute(
+        "SELECT seq, value FROM ingest_queue ORDER BY seq LIMIT ?", (size,)
+    ).fetchall()
+
+
+def remove_through(seq):
+    """Drop every entry up to and including `seq` (a committed batch)."""
+    _connection().execute("DELETE FROM ingest_queue WHERE seq <= ?", (seq,))
+
+
+def pending_count():
+    return _connection().execute("SELECT COUNT(*) FROM ingest_queue").fetchone()[0]
+
+
+def pending_ids(limit):
+    """Ids still queued, oldest first, as [(id, enqueued_at)]."""
+    return _connection().execute(
+        "SELECT string_id, enqueued_at FROM ingest_queue ORDER BY seq LIMIT ?", (limit,)
+    ).fetchall()
+
+
+def is_pending(string_id):
+    row = _connection().execute("SELECT 1 FROM ingest_queue WHERE string_id = ?", (string_id,)).fetchone()
+    return row is not None
@@ -0,0 +1,143 @@
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import sharding
+from .models import AnalyzedString, compute_sha256
+from .signals import strings_created
+
+SHA256_RE = re.compile(r"[0-9a-f]{64}")
+
+
+class LRUCache:
+    """A small thread-safe, size-bounded LRU mapping."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Process-local map of recent lookup input -> resolved primary key
+resolutions = LRUCache(getattr(settings, "ANALYZER_LOOKUP_CACHE_SIZE", 4096))
+
+
+def candidate_ids(string_value):
+    """
+    Primary keys `string_value` can refer to, in priority order.
+
+    The id of a stored string is the sha256 of its value, so a value lookup
+    is a primary-key lookup. Only 64-hex inputs can also be a hash.
+    """
+    ids = [compute_sha256(string_value)]
+    if SHA256_RE.fullmatch(string_value):
+        ids.append(string_value)
+    return ids
+
+
+def known_id(string_value):
+    """
+    The primary key `string_value` resolves to when that can be decided
+    without a query (non-hash input, or a cached resolution), else None.
+    """
+    resolved = resolutions.get(string_value)
+    if resolved is not None:
+        return resolved
+    ids = candidate_ids(string_value)
+    return ids[0] if len(ids) == 1 else None
+
+
+def get_by_value_or_hash(string_value):
+    """
+    Resolve a string value or its sha256 hash with a single query (one per
+    shard involved when sharded). An exact value match wins over a hash match. Returns None if not found.
+    """
+    resolved = resolutions.get(string_value)
+    if resolved is not None:
+        obj = AnalyzedString.objects.for_id(resolved).filter(id=resolved).first()
+        if obj:
+            return obj
+        resolutions.pop(string_value)
+
+    ids = candidate_ids(string_value)
+    if len(ids) == 1:
+        obj = AnalyzedString.objects.for_id(ids[0]).filter(id=ids[0]).first()
+    else:
+        found = AnalyzedString.objects.get_many(ids)
+        obj = next((found[i] for i in ids if i in found), None)
+
+    if obj:
+        resolutions.set(string_value, obj.id)
+    return obj
+
+
+async def aget_by_value_or_hash(string_value):
+    """get_by_value_or_hash() for async views, using the async ORM."""
+    resolved = resolutions.get(string_value)
+    if resolved is not None:
+        obj = await AnalyzedString.objects.for_id(resolved).filter(id=resolved).afirst()
+        if obj:
+            return obj
+        resolutions.pop(string_value)
+
+    ids = candidate_ids(string_value)
+    if len(ids) == 1:
+        obj = await AnalyzedString.objects.for_id(ids[0]).filter(id=ids[0]).afirst()
+    else:
+        found = {}
+        for alias, group in sharding.group_by_shard(ids).items():
+            found.update({o.id: o async for o in AnalyzedString.objects.using(alias).filter(id__in=group)})
+        obj = next((found[i] for i in ids if i in found), None)
+
+    if obj:
+        resolutions.set(string_value, obj.id)
+    return obj
+
+
+@receiver(strings_created)
+def forget_created(sender, instances, using, **kwargs):
+    # A new value now wins over any cached hash match for the same input
+    values = [obj.value for obj in instances]
+
+    def forget():
+        for value in values:
+            resolutions.pop(value)
+    transaction.on_commit(forget, using=using)
+
+
+@receiver(post_delete, sender=AnalyzedString)
+def forget_deleted(sender, instance, using, **kwargs):
+    value, pk = instance.value, instance.pk  # the pk is cleared once delete() returns
+
+    def forget():
+        resolutions.pop(value)
+        resolutions.pop(pk)
+    transaction.on_commit(forget, using=using)
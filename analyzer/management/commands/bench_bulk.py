@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from analyzer.bench import random_strings, rolled_back, timer
+from analyzer.views import StringListCreateView
+
+
+class Command(BaseCommand):
+    help = "Compare single POSTs against one batch POST to /strings/ (changes are rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000, help="Number of strings per run")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        values = random_strings(count, seed=options["seed"])
+        factory = APIRequestFactory()
+        view = StringListCreateView.as_view()
+        timings = {}
+
+        with rolled_back():
+            with timer(timings, "single"):
+                for value in values:
+                    view(factory.post("/strings/", {"value": value}, format="json"))
+
+        with rolled_back():
+            with timer(timings, "batch"):
+                step = settings.ANALYZER_BULK_MAX_ITEMS
+                for start in range(0, count, step):
+                    view(factory.post("/strings/", values[start:start + step], format="json"))
+
+        for label in ("single", "batch"):
+            seconds = timings[label]
+            self.stdout.write(f"{label:>6}: {seconds:8.3f}s  {count / seconds:10.0f} strings/sec")
+        self.stdout.write(f"speedup: {timings['single'] / timings['batch']:.1f}x")
@@ -0,0 +1,46 @@
+import string
+
+from django.core.management.base import BaseCommand
+
+from analyzer.bench import random_strings, rolled_back, timer
+from analyzer.plan import filter_by_character
+from analyzer.models import AnalyzedString
+
+SEED_CHUNK = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N strings (rolled back afterwards) and compare contains_character "
+        "lookups through the JSON has_key scan and the CharacterOccurrence index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="Rows to seed (e.g. 1000000)")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+        parser.add_argument("--chars", default="qz7", help="Characters to look up")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        # Mostly letters with a few rare digits so selectivity varies per character
+        values = random_strings(rows, alphabet=string.ascii_lowercase * 4 + string.digits + "    ")
+
+        with rolled_back():
+            with timer(timings := {}, "seed"):
+                for start in range(0, rows, SEED_CHUNK):
+                    AnalyzedString.objects.bulk_analyze(values[start:start + SEED_CHUNK])
+            self.stdout.write(f"seeded {rows} rows in {timings['seed']:.1f}s")
+
+            base = AnalyzedString.objects.all()
+            strategies = {
+                "json has_key": lambda ch: base.filter(character_frequency_json__has_key=ch),
+                "char index": lambda ch: filter_by_character(base, ch),
+            }
+            for ch in options["chars"]:
+                for label, build in strategies.items():
+                    results = {}
+                    for run in range(options["repeat"]):
+                        with timer(results, run):
+                            matched = build(ch).count()
+                    best = min(results.values())
+                    self.stdout.write(f"{ch!r} {label:>13}: {best * 1000:9.2f} ms  ({matched} matches)")
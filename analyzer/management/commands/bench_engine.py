@@ -0,0 +1,51 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from analyzer import engine
+
+
+def legacy_analyze(text):
+    """The per-character loop AnalyzedString.save() used before analyzer.engine."""
+    text_lower = text.lower()
+    freq = {}
+    for ch in text_lower:
+        freq[ch] = freq.get(ch, 0) + 1
+    return (len(text), text_lower == text_lower[::-1], len(set(text_lower)), len(text.split()), freq)
+
+
+def make_inputs(count, seed=0):
+    rng = random.Random(seed)
+    letters = string.ascii_letters + "    "
+    # Mixed scripts, combining marks, astral code points and case-folding oddities
+    unicode_pool = "ßİıΣσςéé́😀🇳🇬‍한글العربية" + letters
+    return {
+        "short": ["".join(rng.choice(letters) for _ in range(rng.randint(3, 16))) for _ in range(count)],
+        "255-char": ["".join(rng.choice(letters) for _ in range(255)) for _ in range(count)],
+        "unicode": ["".join(rng.choice(unicode_pool) for _ in range(rng.randint(16, 255))) for _ in range(count)],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the legacy per-character loop against engine.analyze and engine.analyze_batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10000, help="Strings per input class")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best is reported)")
+
+    def handle(self, *args, **options):
+        cases = {
+            "legacy loop": lambda texts: [legacy_analyze(t) for t in texts],
+            "analyze": lambda texts: [engine.analyze(t) for t in texts],
+            "analyze_batch": engine.analyze_batch,
+        }
+        for name, texts in make_inputs(options["count"]).items():
+            for label, run in cases.items():
+                best = float("inf")
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    run(texts)
+                    best = min(best, time.perf_counter() - start)
+                self.stdout.write(f"{name:>9} {label:>14}: {len(texts) / best:12.0f} strings/sec")
@@ -0,0 +1,59 @@
+import json
+import string
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from analyzer.bench import random_strings, rolled_back, timer
+from analyzer.models import AnalyzedString, decode_frequency_map, encode_frequency_map
+from analyzer.serializers import AnalyzedStringSerializer
+
+SEED_CHUNK = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the JSON and compact binary frequency map encodings: stored size, "
+        "encode/decode throughput, and reading + serializing seeded rows (rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000)
+        parser.add_argument("--max-length", type=int, default=255)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        values = random_strings(rows, max_length=options["max_length"],
+                                alphabet=string.ascii_letters + string.digits + "éßΣ😀     ")
+        maps = [{} for _ in values]
+        for freq, value in zip(maps, values):
+            for ch in value.lower():
+                freq[ch] = freq.get(ch, 0) + 1
+
+        json_blobs = [json.dumps(freq).encode() for freq in maps]
+        packed = [encode_frequency_map(freq) for freq in maps]
+        self.stdout.write(f"bytes/row    json: {sum(map(len, json_blobs)) / rows:8.1f}")
+        self.stdout.write(f"bytes/row  binary: {sum(map(len, packed)) / rows:8.1f}")
+
+        timings = {}
+        with timer(timings, "json encode"):
+            [json.dumps(freq) for freq in maps]
+        with timer(timings, "json decode"):
+            [json.loads(blob) for blob in json_blobs]
+        with timer(timings, "binary encode"):
+            [encode_frequency_map(freq) for freq in maps]
+        with timer(timings, "binary decode"):
+            [decode_frequency_map(blob) for blob in packed]
+
+        for compact in (False, True):
+            label = "binary" if compact else "json"
+            with rolled_back(), override_settings(ANALYZER_COMPACT_FREQUENCY_MAP=compact):
+                for start in range(0, rows, SEED_CHUNK):
+                    AnalyzedString.objects.bulk_analyze(values[start:start + SEED_CHUNK])
+                with timer(timings, f"{label} read rows"):
+                    objs = list(AnalyzedString.objects.all())
+                with timer(timings, f"{label} serialize"):
+                    AnalyzedStringSerializer(objs, many=True).data
+
+        for label, seconds in timings.items():
+            self.stdout.write(f"{label:>18}: {rows / seconds:12.0f} rows/sec")
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analyzer.natlang import _parse_normalized, normalize_query, parse_natural_language_query
+
+QUERIES = [
+    "all single word palindromic strings",
+    "strings longer than 10 characters",
+    "strings containing the letter z",
+    "palindromes longer than 4",
+    "between 5 and 10 characters",
+    "exactly 3 words that are not palindromes",
+    "strings containing the letters a, b and c",
+    "strings with the letter e at least 3 times",
+]
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark natural-language parsing with and without the parse-plan cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000, help="Passes over the query set")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        total = iterations * len(QUERIES)
+        uncached = _parse_normalized.__wrapped__
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for q in QUERIES:
+                dict(uncached(normalize_query(q)))
+        cold = time.perf_counter() - start
+
+        _parse_normalized.cache_clear()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for q in QUERIES:
+                parse_natural_language_query(q)
+        warm = time.perf_counter() - start
+
+        self.stdout.write(f"uncached: {total / cold:10.0f} parses/sec")
+        self.stdout.write(f"  cached: {total / warm:10.0f} parses/sec")
+        self.stdout.write(f"cache: {_parse_normalized.cache_info()}")
@@ -0,0 +1,111 @@
+import random
+import string
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+
+from analyzer.bench import random_strings, rolled_back, timer
+from analyzer.filters import compile_plan
+from analyzer.management.commands.bench_natlang import QUERIES as NATLANG_QUERIES
+from analyzer.models import AnalyzedString
+from analyzer.natlang import parse_natural_language_query
+from analyzer.pagination import KeysetPagination
+
+SEED_CHUNK = 5000
+PAGE_SIZE = 50
+
+# Every filter combination GET /strings/ supports, as query strings
+LIST_QUERIES = [
+    "",
+    "is_palindrome=true",
+    "is_palindrome=false",
+    "min_length=10",
+    "min_length=5&max_length=8",
+    "is_palindrome=true&min_length=5&max_length=9",
+    "is_palindrome=false&min_length=30",
+    "word_count=1",
+    "word_count=3",
+    "word_count=2&min_length=10&max_length=20",
+    "word_count=1&is_palindrome=true",
+    "word_count=1&is_palindrome=true&min_length=3",
+    "contains_character=z",
+    "contains_all=aeq",
+    "contains_any=qxz",
+    "min_char_count=e:3",
+    "char_count[a]__gte=2&char_count[z]__lt=1",
+    "is_palindrome=true&contains_character=a",
+    "word_count=2&contains_all=ab",
+    "contains=abc",
+    "contains=qz",
+    "startswith=ab",
+    "endswith=xyz",
+    "contains=ab c&word_count=2",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N strings (rolled back afterwards), then run every list and "
+        "natural-language filter combination, printing the query plan (EXPLAIN) "
+        "and latency of the page query and the count. Works on SQLite and MySQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query (best is reported)")
+        parser.add_argument("--no-explain", action="store_true", help="Only print latencies")
+        parser.add_argument(
+            "--try-index", action="append", default=[], metavar="COLUMNS",
+            help="Comma-separated columns of an extra index to create for this run only, "
+                 "e.g. --try-index is_palindrome,length (repeatable; not on MySQL, where DDL commits)",
+        )
+        parser.add_argument(
+            "--drop-index", action="append", default=[], metavar="NAME",
+            help="Name of an existing index to drop for this run only (same restriction)",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        rng = random.Random(0)
+        # Mostly short words, some palindromes, so every filter has realistic selectivity
+        values = random_strings(rows, max_length=60, alphabet=string.ascii_lowercase * 3 + string.digits + "      ")
+        values += [w + w[::-1] for w in random_strings(rows // 20, max_length=12, seed=1)]
+        rng.shuffle(values)
+
+        cases = [(f"list  {q or '(no filters)'}", QueryDict(q)) for q in LIST_QUERIES]
+        cases += [(f"natlang {q!r}", parse_natural_language_query(q)) for q in NATLANG_QUERIES]
+
+        if (options["try_index"] or options["drop_index"]) and connection.vendor == "mysql":
+            raise CommandError("--try-index/--drop-index need transactional DDL (not MySQL)")
+
+        with rolled_back():
+            table = AnalyzedString._meta.db_table
+            with connection.cursor() as cursor:
+                for n, columns in enumerate(options["try_index"]):
+                    cursor.execute(f"CREATE INDEX bench_try_{n} ON {table} ({columns})")
+                for name in options["drop_index"]:
+                    cursor.execute(f"DROP INDEX {name}")
+
+            with timer(timings := {}, "seed"):
+                for start in range(0, len(values), SEED_CHUNK):
+                    AnalyzedString.objects.bulk_analyze(values[start:start + SEED_CHUNK])
+            self.stdout.write(f"seeded {len(values)} rows in {timings['seed']:.1f}s\n")
+
+            for label, params in cases:
+                queryset = compile_plan(params).apply(AnalyzedString.objects.all())
+                page = queryset.order_by(*KeysetPagination.ordering)[:PAGE_SIZE + 1]
+                results = {}
+                for run in range(options["repeat"]):
+                    with timer(results, ("page", run)):
+                        list(page.all())  # .all(): a fresh query every run
+                    with timer(results, ("count", run)):
+                        matched = queryset.count()
+                best = {kind: min(t for (k, _), t in results.items() if k == kind) * 1000
+                        for kind in ("page", "count")}
+                self.stdout.write(
+                    f"{label}\n  page {best['page']:8.2f} ms   count {best['count']:8.2f} ms   ({matched} rows)"
+                )
+                if not options["no_explain"]:
+                    for line in page.explain().splitlines():
+                        self.stdout.write(f"    {line}")
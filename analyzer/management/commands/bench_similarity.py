@@ -0,0 +1,81 @@
+import random
+import statistics
+import string
+
+from django.core.management.base import BaseCommand
+
+from analyzer import minhash
+from analyzer.bench import random_strings, rolled_back, timer
+from analyzer.models import AnalyzedString, compute_sha256
+from analyzer.similarity import similar_strings
+from analyzer.views import RELATED_MAX_LIMIT
+
+SEED_CHUNK = 5000
+ALPHABET = string.ascii_lowercase + "    "
+
+
+def near_duplicates(value, rng):
+    """Variants of `value` a near-duplicate lookup should find (case, spacing, typos, an extra word)."""
+    def typo(text):
+        i = rng.randrange(len(text))
+        return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+    return [
+        value.upper(),
+        "  ".join(value.split()),
+        typo(value),
+        typo(typo(value)),
+        value + " " + "".join(rng.choice(string.ascii_lowercase) for _ in range(4)),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N strings plus planted near-duplicates (rolled back afterwards), "
+        "then run /similar lookups and report latency and recall against an "
+        "exhaustive pairwise comparison."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="e.g. 100000 or 1000000")
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--threshold", type=float, default=0.8)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        threshold = options["threshold"]
+        queries = random_strings(options["queries"], min_length=30, max_length=80, seed=1, alphabet=ALPHABET)
+        values = set(random_strings(options["rows"], min_length=10, max_length=80, alphabet=ALPHABET))
+        for query in queries:
+            values.update(near_duplicates(query, rng))
+        values.update(queries)
+        values = list(values)
+
+        with rolled_back():
+            with timer(timings := {}, "seed"):
+                for start in range(0, len(values), SEED_CHUNK):
+                    AnalyzedString.objects.bulk_analyze(values[start:start + SEED_CHUNK])
+            self.stdout.write(f"seeded {len(values)} rows in {timings['seed']:.1f}s\n")
+
+            latencies, found, expected = [], 0, 0
+            stored = [(value, minhash.shingles(value)) for value in values]
+            for query in queries:
+                with timer(results := {}, "lookup"):
+                    matches = similar_strings(query, threshold, RELATED_MAX_LIMIT, exclude_id=compute_sha256(query))
+                latencies.append(results["lookup"] * 1000)
+
+                # Ground truth: compare the query with every stored string
+                query_shingles = minhash.shingles(query)
+                truth = {value for value, shingles in stored
+                         if value != query and minhash.jaccard(query_shingles, shingles) >= threshold}
+                expected += len(truth)
+                found += len(truth & {obj.value for _, obj in matches})
+
+        latencies.sort()
+        self.stdout.write(
+            f"{len(queries)} lookups at threshold {threshold}: "
+            f"p50 {statistics.median(latencies):.2f} ms   "
+            f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.2f} ms   "
+            f"max {latencies[-1]:.2f} ms"
+        )
+        self.stdout.write(f"recall {found / expected:.4f} ({found} of {expected} similar pairs found)")
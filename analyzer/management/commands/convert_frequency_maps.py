@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from analyzer import sharding
+from analyzer.models import AnalyzedString, decode_frequency_map, encode_frequency_map
+
+
+class Command(BaseCommand):
+    help = "Rewrite stored frequency maps into the binary column (or back to JSON)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--to", choices=["binary", "json"], default="binary")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        to_binary = options["to"] == "binary"
+        batch_size = options["batch_size"]
+        source = Q(character_frequency_json__isnull=False) if to_binary else Q(character_frequency_blob__isnull=False)
+        converted = 0
+        for alias in sharding.shards():
+            rows = (
+                AnalyzedString.objects.using(alias).filter(source)
+                .only("id", "character_frequency_json", "character_frequency_blob")
+                .iterator(chunk_size=batch_size)
+            )
+            converted += self.convert(rows, to_binary, batch_size, alias)
+        self.stdout.write(f"Converted {converted} rows to {options['to']}")
+
+    def convert(self, rows, to_binary, batch_size, alias):
+        converted = 0
+        batch = []
+        for obj in rows:
+            if to_binary:
+                obj.character_frequency_blob = encode_frequency_map(obj.character_frequency_json)
+                obj.character_frequency_json = None
+            else:
+                obj.character_frequency_json = decode_frequency_map(obj.character_frequency_blob)
+                obj.character_frequency_blob = None
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                converted += self.flush(batch, alias)
+        return converted + self.flush(batch, alias)
+
+    def flush(self, batch, alias):
+        AnalyzedString.objects.using(alias).bulk_update(batch, ["character_frequency_json", "character_frequency_blob"])
+        count = len(batch)
+        batch.clear()
+        return count
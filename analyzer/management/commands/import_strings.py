@@ -0,0 +1,137 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from analyzer.models import AnalyzedString
+
+FORMATS = ("ndjson", "csv", "lines")
+
+
+def detect_format(path):
+    """Guess the input format from the file extension (defaults to lines)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if ext == ".csv":
+        return "csv"
+    return "lines"
+
+
+def read_values(fh, fmt, column="value"):
+    """
+    Yield one raw value per input record.
+
+    Records that cannot be decoded are yielded as None so they are
+    reported as invalid (and still counted for checkpointing).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(fh)
+        if reader.fieldnames is None or column not in reader.fieldnames:
+            raise CommandError(f"CSV input has no '{column}' column")
+        for row in reader:
+            yield row[column]
+    elif fmt == "ndjson":
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield None
+                continue
+            yield item.get("value") if isinstance(item, dict) else item
+    else:
+        for line in fh:
+            yield line.rstrip("\r\n")
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream strings from an NDJSON, CSV or plain-text file into the database. "
+        "Progress is checkpointed after every committed chunk so an interrupted "
+        "import can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import")
+        parser.add_argument("--format", choices=FORMATS, help="Input format (default: from file extension)")
+        parser.add_argument("--column", default="value", help="CSV column holding the string (default: value)")
+        parser.add_argument("--encoding", default="utf-8")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Records analyzed and committed per transaction (default: 1000)")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+        parser.add_argument("--resume", action="store_true", help="Skip records already committed per the checkpoint")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        chunk_size = options["chunk_size"]
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive")
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+
+        done = self.load_checkpoint(checkpoint_path, path) if options["resume"] else 0
+        totals = {"created": 0, "duplicate": 0, "invalid": 0}
+        processed = 0
+        start = time.perf_counter()
+
+        newline = "" if fmt == "csv" else None
+        with open(path, encoding=options["encoding"], newline=newline) as fh:
+            values = islice(read_values(fh, fmt, options["column"]), done, None)
+            if done:
+                self.stdout.write(f"Resuming after {done} records")
+
+            for chunk in chunked(values, chunk_size):
+                with transaction.atomic():
+                    outcomes = AnalyzedString.objects.bulk_analyze(chunk, batch_size=chunk_size)
+                for outcome, _ in outcomes:
+                    totals[outcome] += 1
+                processed += len(chunk)
+                self.save_checkpoint(checkpoint_path, path, done + processed)
+
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{done + processed} records ({processed / elapsed:.0f} rows/sec)")
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {processed} records in {elapsed:.2f}s ({rate:.0f} rows/sec): "
+            f"{totals['created']} created, {totals['duplicate']} duplicates, {totals['invalid']} invalid"
+        ))
+
+    def load_checkpoint(self, checkpoint_path, path):
+        if not os.path.exists(checkpoint_path):
+            return 0
+        with open(checkpoint_path) as fh:
+            checkpoint = json.load(fh)
+        if checkpoint.get("path") != os.path.abspath(path):
+            raise CommandError(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('path')}")
+        return checkpoint["records"]
+
+    def save_checkpoint(self, checkpoint_path, path, records):
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump({"path": os.path.abspath(path), "records": records}, fh)
+        os.replace(tmp_path, checkpoint_path)
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from analyzer import ingest
+from analyzer.models import AnalyzedString
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the write-behind ingest queue (ANALYZER_ASYNC_INGEST): insert queued "
+        "strings in batches with bulk_analyze, removing each batch from the queue "
+        "once it is committed. Runs until interrupted, or until the queue is empty "
+        "with --once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Strings inserted per batch (default: 1000)")
+        parser.add_argument("--interval", type=float, default=0.5,
+                            help="Seconds to wait when the queue is empty (default: 0.5)")
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                batch = ingest.next_batch(options["batch_size"])
+                if not batch:
+                    if options["once"]:
+                        return
+                    time.sleep(options["interval"])
+                    continue
+                try:
+                    self.flush(batch)
+                except DatabaseError as e:
+                    # Leave the batch queued and retry with a fresh connection
+                    self.stderr.write(f"batch of {len(batch)} failed, retrying: {e}")
+                    close_old_connections()
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(f"stopped; {ingest.pending_count()} strings still queued")
+
+    def flush(self, batch):
+        start = time.perf_counter()
+        outcomes = AnalyzedString.objects.bulk_analyze([value for _, value in batch])
+        ingest.remove_through(batch[-1][0])
+        counts = {}
+        for status, _ in outcomes:
+            counts[status] = counts.get(status, 0) + 1
+        summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+        self.stdout.write(f"flushed {len(batch)} in {(time.perf_counter() - start) * 1000:.0f} ms ({summary})")
@@ -0,0 +1,114 @@
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Client:
+    """A minimal keep-alive HTTP/1.1 client (one connection per worker)."""
+
+    def __init__(self, url):
+        self.url = urlsplit(url)
+        if self.url.scheme != "http":
+            raise CommandError("Only http:// URLs are supported")
+        self.reader = self.writer = None
+
+    async def request(self, method, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.url.hostname, self.url.port or 80)
+        target = self.url.path or "/"
+        if self.url.query:
+            target += "?" + self.url.query
+        payload = body.encode() if body is not None else b""
+        head = (
+            f"{method} {target} HTTP/1.1\r\nHost: {self.url.netloc}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n"
+        )
+        self.writer.write(head.encode() + payload)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length, keep_alive = None, True
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection" and value == "close":
+                keep_alive = False
+        if length is None:
+            await self.reader.read()  # body ends when the server closes
+            keep_alive = False
+        else:
+            await self.reader.readexactly(length)
+        if not keep_alive:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent requests to one or more running servers (e.g. the same API "
+        "under WSGI and ASGI) and report RPS and p50/p99 latency for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Full URLs, e.g. http://127.0.0.1:8000/strings/?limit=50")
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=5000, help="Total requests per URL")
+        parser.add_argument("--method", default="GET")
+        parser.add_argument(
+            "--body",
+            help="Request body; {n} is replaced by a request counter, e.g. '{\"value\": \"load {n}\"}'",
+        )
+
+    def handle(self, *args, **options):
+        for url in options["urls"]:
+            latencies, statuses, elapsed = asyncio.run(self.run(url, options))
+            latencies.sort()
+            codes = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+            self.stdout.write(
+                f"{url}\n"
+                f"  {len(latencies) / elapsed:9.0f} req/s   "
+                f"p50 {self.percentile(latencies, 50):7.1f} ms   "
+                f"p99 {self.percentile(latencies, 99):7.1f} ms   "
+                f"mean {statistics.fmean(latencies):7.1f} ms   ({codes})"
+            )
+
+    async def run(self, url, options):
+        counter = itertools.count()
+        total = options["requests"]
+        latencies, statuses = [], {}
+
+        async def worker():
+            client = Client(url)
+            try:
+                while (n := next(counter)) < total:
+                    body = options["body"].replace("{n}", str(n)) if options["body"] else None
+                    start = time.perf_counter()
+                    try:
+                        code = await client.request(options["method"].upper(), body)
+                    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                        client.close()
+                        code = "error"
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    statuses[code] = statuses.get(code, 0) + 1
+            finally:
+                client.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(options["concurrency"], total))))
+        return latencies, statuses, time.perf_counter() - start
+
+    @staticmethod
+    def percentile(sorted_values, pct):
+        index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+        return sorted_values[index]
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from analyzer import sharding, stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the /strings/stats summary table from all stored strings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=None,
+                            help="Database alias (default: every shard, or the write database)")
+
+    def handle(self, *args, **options):
+        aliases = [options["database"]] if options["database"] else sharding.shards()
+        for alias in aliases:
+            buckets = stats.rebuild(using=alias)
+            self.stdout.write(f"Rebuilt {buckets} stat buckets" + (f" on {alias}" if alias else ""))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='analyzedstring',
+            name='analyzer_an_value_77b206_idx',
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['created_at', 'id'], name='analyzer_an_created_7df819_idx'),
+        ),
+    ]
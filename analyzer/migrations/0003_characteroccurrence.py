@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0002_keyset_pagination_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_point', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='character_occurrences', to='analyzer.analyzedstring')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['code_point', 'count', 'string'], name='analyzer_ch_code_po_4b4603_idx')],
+                'constraints': [models.UniqueConstraint(fields=('string', 'code_point'), name='unique_string_code_point')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:24
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def backfill(apps, schema_editor):
+    AnalyzedString = apps.get_model("analyzer", "AnalyzedString")
+    CharacterOccurrence = apps.get_model("analyzer", "CharacterOccurrence")
+    db = schema_editor.connection.alias
+
+    batch = []
+    rows = AnalyzedString.objects.using(db).values_list("id", "character_frequency_map")
+    for string_id, freq in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(
+            CharacterOccurrence(code_point=ord(ch), string_id=string_id, count=count)
+            for ch, count in freq.items()
+        )
+        if len(batch) >= BATCH_SIZE:
+            CharacterOccurrence.objects.using(db).bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        CharacterOccurrence.objects.using(db).bulk_create(batch, ignore_conflicts=True)
+
+
+def clear(apps, schema_editor):
+    CharacterOccurrence = apps.get_model("analyzer", "CharacterOccurrence")
+    CharacterOccurrence.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_characteroccurrence'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:26
+
+import string
+
+from django.db import migrations, models
+
+# Frozen copy of analyzer.models.CHAR_MASK_ALPHABET at the time of this migration
+CHAR_MASK_ALPHABET = string.ascii_lowercase + string.digits + " .,;:!?'\"-_()/\\@#$%&*+="
+BATCH_SIZE = 2000
+
+
+def backfill(apps, schema_editor):
+    AnalyzedString = apps.get_model("analyzer", "AnalyzedString")
+    db = schema_editor.connection.alias
+    bits = {ch: 1 << bit for bit, ch in enumerate(CHAR_MASK_ALPHABET)}
+
+    batch = []
+    for obj in AnalyzedString.objects.using(db).only("id", "character_frequency_map").iterator(chunk_size=BATCH_SIZE):
+        obj.char_mask = 0
+        for ch in obj.character_frequency_map:
+            obj.char_mask |= bits.get(ch, 0)
+        batch.append(obj)
+        if len(batch) >= BATCH_SIZE:
+            AnalyzedString.objects.using(db).bulk_update(batch, ["char_mask"])
+            batch = []
+    if batch:
+        AnalyzedString.objects.using(db).bulk_update(batch, ["char_mask"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_backfill_character_occurrences'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='char_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_analyzedstring_char_mask'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analyzedstring',
+            name='value',
+            field=models.TextField(),
+        ),
+    ]
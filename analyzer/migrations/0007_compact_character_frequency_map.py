@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_analyzedstring_value_text'),
+    ]
+
+    operations = [
+        # Rename the field but keep the existing column
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterField(
+                    model_name='analyzedstring',
+                    name='character_frequency_map',
+                    field=models.JSONField(null=True),
+                ),
+            ],
+            state_operations=[
+                migrations.RenameField(
+                    model_name='analyzedstring',
+                    old_name='character_frequency_map',
+                    new_name='character_frequency_json',
+                ),
+                migrations.AlterField(
+                    model_name='analyzedstring',
+                    name='character_frequency_json',
+                    field=models.JSONField(db_column='character_frequency_map', null=True),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='character_frequency_blob',
+            field=models.BinaryField(null=True),
+        ),
+    ]
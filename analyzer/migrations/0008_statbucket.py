@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:41
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill(apps, schema_editor):
+    AnalyzedString = apps.get_model("analyzer", "AnalyzedString")
+    CharacterOccurrence = apps.get_model("analyzer", "CharacterOccurrence")
+    StatBucket = apps.get_model("analyzer", "StatBucket")
+    db = schema_editor.connection.alias
+    strings = AnalyzedString.objects.using(db)
+
+    totals = strings.aggregate(n=Count("id"), length=Sum("length"))
+    buckets = [
+        StatBucket(kind="strings", key=0, count=totals["n"]),
+        StatBucket(kind="total_length", key=0, count=totals["length"] or 0),
+    ]
+    for kind, field in (("palindrome", "is_palindrome"), ("length", "length"), ("word_count", "word_count")):
+        for key, n in strings.values_list(field).annotate(n=Count("id")).order_by():
+            buckets.append(StatBucket(kind=kind, key=int(key), count=n))
+    occurrences = CharacterOccurrence.objects.using(db).values_list("code_point").annotate(n=Sum("count"))
+    for code_point, n in occurrences.order_by():
+        buckets.append(StatBucket(kind="character", key=code_point, count=n))
+    StatBucket.objects.using(db).bulk_create(buckets, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_compact_character_frequency_map'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('key', models.BigIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='unique_stat_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
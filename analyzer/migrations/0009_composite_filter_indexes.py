@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_statbucket'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='analyzedstring',
+            name='analyzer_an_is_pali_7bf271_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='analyzedstring',
+            name='analyzer_an_word_co_0dc9e5_idx',
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['is_palindrome', 'length'], name='analyzer_an_is_pali_036000_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['word_count', 'is_palindrome', 'length'], name='analyzer_an_word_co_35d0ea_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+# As in analyzer.models at the time of this migration
+TRIGRAM_START = "\x02"
+TRIGRAM_END = "\x03"
+TRIGRAM_UNINDEXED = ""
+TRIGRAM_MAX_LENGTH = 1024
+
+
+def backfill(apps, schema_editor):
+    AnalyzedString = apps.get_model("analyzer", "AnalyzedString")
+    Trigram = apps.get_model("analyzer", "Trigram")
+    db = schema_editor.connection.alias
+
+    batch = []
+    rows = AnalyzedString.objects.using(db).values_list("id", "value", "length")
+    for string_id, value, length in rows.iterator(chunk_size=BATCH_SIZE):
+        if length > TRIGRAM_MAX_LENGTH:
+            grams = [TRIGRAM_UNINDEXED]
+        else:
+            padded = f"{TRIGRAM_START}{value.lower()}{TRIGRAM_END}"
+            grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+        batch.extend(Trigram(gram=gram, string_id=string_id) for gram in grams)
+        if len(batch) >= BATCH_SIZE:
+            Trigram.objects.using(db).bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        Trigram.objects.using(db).bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0009_composite_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='analyzer.analyzedstring')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gram', 'string'], name='analyzer_tr_gram_f44d3c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('string', 'gram'), name='unique_string_trigram')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
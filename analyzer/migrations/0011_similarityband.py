@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Pure functions without model imports; bucket values must match what
+# new rows get anyway
+from analyzer import minhash
+
+BATCH_SIZE = 2000
+SIMILARITY_MAX_LENGTH = 4096
+
+
+def backfill(apps, schema_editor):
+    AnalyzedString = apps.get_model("analyzer", "AnalyzedString")
+    SimilarityBand = apps.get_model("analyzer", "SimilarityBand")
+    db = schema_editor.connection.alias
+
+    batch = []
+    rows = AnalyzedString.objects.using(db).filter(length__lte=SIMILARITY_MAX_LENGTH).values_list("id", "value")
+    for string_id, value in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(
+            SimilarityBand(band=band, bucket=bucket, string_id=string_id)
+            for band, bucket in minhash.band_buckets(minhash.signature(minhash.shingles(value)))
+        )
+        if len(batch) >= BATCH_SIZE:
+            SimilarityBand.objects.using(db).bulk_create(batch)
+            batch = []
+    if batch:
+        SimilarityBand.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0010_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarityBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_bands', to='analyzer.analyzedstring')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket', 'string'], name='analyzer_si_band_2055b0_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:18
+
+import hashlib
+from collections import Counter
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def anagram_key(value):
+    # Frozen copy of analyzer.models.compute_anagram_key at the time of this migration
+    freq = Counter(value.lower())
+    letters = sorted(ch for ch in freq if ch.isalnum())
+    if not letters:
+        return ""
+    digest = hashlib.sha256()
+    for ch in letters:
+        digest.update((ch * freq[ch]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def backfill(apps, schema_editor):
+    AnalyzedString = apps.get_model("analyzer", "AnalyzedString")
+    db = schema_editor.connection.alias
+
+    batch = []
+    for obj in AnalyzedString.objects.using(db).only("id", "value").iterator(chunk_size=BATCH_SIZE):
+        obj.anagram_key = anagram_key(obj.value)
+        batch.append(obj)
+        if len(batch) >= BATCH_SIZE:
+            AnalyzedString.objects.using(db).bulk_update(batch, ["anagram_key"])
+            batch = []
+    if batch:
+        AnalyzedString.objects.using(db).bulk_update(batch, ["anagram_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0011_similarityband'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='anagram_key',
+            field=models.CharField(default='', max_length=64),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['anagram_key'], name='analyzer_an_anagram_0fc24b_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:38
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicates(apps, schema_editor):
+    # Concurrent inserts of one string could write its bands twice; keep the
+    # oldest row of each (string, band) so the constraint can be added
+    SimilarityBand = apps.get_model("analyzer", "SimilarityBand")
+    bands = SimilarityBand.objects.using(schema_editor.connection.alias)
+    duplicated = (
+        bands.values("string_id", "band").annotate(n=Count("id"), keep=Min("id")).filter(n__gt=1).order_by()
+    )
+    for row in duplicated:
+        bands.filter(string_id=row["string_id"], band=row["band"]).exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0012_analyzedstring_anagram_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='similarityband',
+            constraint=models.UniqueConstraint(fields=('string', 'band'), name='unique_string_band'),
+        ),
+    ]
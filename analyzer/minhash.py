@@ -0,0 +1,66 @@
+"""
+MinHash signatures and LSH band buckets for near-duplicate lookup.
+
+Strings are compared by the Jaccard similarity of their shingle sets:
+character trigrams of the lowercased value with whitespace collapsed, so
+case and spacing differences do not count and a typo only changes the
+shingles around it. A signature keeps, for each of MINHASH_PERMUTATIONS
+hash functions, the smallest hash of any shingle; two signatures agree at
+a position with probability (about) equal to the Jaccard similarity.
+The hash functions are one 64-bit blake2b hash per shingle XORed with a
+random mask per position, about twice as fast in Python as the classic
+(a*x + b) mod p family for a slightly noisier estimate; matches are
+verified on the exact similarity anyway.
+
+LSH splits the signature into LSH_BANDS bands of LSH_ROWS values and hashes
+each band into a bucket. Strings sharing any bucket become candidates: with
+16 bands of 4 a pair at similarity 0.8 shares one with probability 0.9998,
+at 0.5 with 0.64 and at 0.3 with 0.12.
+
+Everything here is deterministic (fixed seeds, no str hash()), because
+bucket values are stored. Changing any constant requires re-indexing.
+"""
+import hashlib
+import random
+import struct
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 3
+
+HASH_MASKS = [random.Random(0x5EED + i).getrandbits(64) for i in range(MINHASH_PERMUTATIONS)]
+
+
+def shingles(text):
+    """Set of character trigrams of the normalized text (the whole text if shorter)."""
+    normalized = " ".join(text.lower().split())
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def signature(shingle_set):
+    """MinHash signature (list of MINHASH_PERMUTATIONS ints) of a shingle set."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingle_set
+    ]
+    return [min(h ^ mask for h in hashes) for mask in HASH_MASKS]
+
+
+def band_buckets(sig):
+    """[(band, bucket)] for a signature; buckets are signed 64-bit ints."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = sig[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<{LSH_ROWS}Q", *rows), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+    return buckets
@@ -1,7 +1,16 @@
-from django.db import models
+from django.conf import settings
+from django.db import DatabaseError, connections, models, router, transaction
+from django.db.models import sql
+from django.db.models.constants import OnConflict
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from collections import Counter
 import hashlib
+import string
+import struct
+
+from . import executor, minhash, sharding
+from .signals import strings_created
 
 
 # Utility: compute SHA-256 hash of the string
@@ -10,26 +19,261 @@ def compute_sha256(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+# Characters tracked by AnalyzedString.char_mask, one bit each. Kept under
+# 64 entries so the mask fits a signed BIGINT without using the sign bit.
+# Only ever append: stored rows depend on the existing bit positions.
+CHAR_MASK_ALPHABET = string.ascii_lowercase + string.digits + " .,;:!?'\"-_()/\\@#$%&*+="
+CHAR_MASK_BITS = {ch: 1 << bit for bit, ch in enumerate(CHAR_MASK_ALPHABET)}
+
+
+def compute_char_mask(chars):
+    """
+    Split `chars` into a presence bitmask over CHAR_MASK_ALPHABET and the
+    set of characters the mask cannot represent.
+    """
+    mask = 0
+    unmasked = set()
+    for ch in chars:
+        bit = CHAR_MASK_BITS.get(ch)
+        if bit is None:
+            unmasked.add(ch)
+        else:
+            mask |= bit
+    return mask, unmasked
+
+
+# Anagram key: the letters and digits of the lowercased value in sorted
+# order, so "Listen" and "silent!" share one. Stored as its sha256 so the
+# indexed column stays short for long values; "" when there are none.
+def compute_anagram_key(freq):
+    """Anagram key of a value from its (lowercased) character frequency map."""
+    letters = sorted(ch for ch in freq if ch.isalnum())
+    if not letters:
+        return ""
+    digest = hashlib.sha256()
+    for ch in letters:
+        digest.update((ch * freq[ch]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def anagram_key_of(text):
+    """compute_anagram_key() for a value that has not been analyzed."""
+    return compute_anagram_key(Counter(text.lower()))
+
+
+# Trigram index: grams of the lowercased value between start/end markers,
+# so prefixes and suffixes have grams of their own. Longer values are not
+# indexed (they would add up to one row per character): they get a single
+# TRIGRAM_UNINDEXED row instead, which makes them a candidate for every
+# substring filter, and are checked directly.
+TRIGRAM_START = "\x02"
+TRIGRAM_END = "\x03"
+TRIGRAM_UNINDEXED = ""
+TRIGRAM_MAX_LENGTH = 1024
+
+
+def compute_trigrams(text):
+    """The set of distinct trigrams of `text` as stored in the Trigram table."""
+    padded = f"{TRIGRAM_START}{text.lower()}{TRIGRAM_END}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Longer strings get no SimilarityBand rows: near-duplicate lookup is meant
+# for short values, and shingling documents on every save is too slow
+SIMILARITY_MAX_LENGTH = 4096
+
+# ER_DUP_ENTRY: the only warning AnalyzedString.insert() expects from INSERT IGNORE
+MYSQL_DUPLICATE_ENTRY = 1062
+
+
+# character_frequency_blob layout: two struct format bytes (code points,
+# counts), then every code point, then every count, each packed little-endian
+# with the smallest unsigned type that fits. Entries keep first-seen order.
+FREQUENCY_FORMATS = ((0xFF, "B"), (0xFFFF, "H"), (0xFFFFFFFF, "I"))
+
+
+def _smallest_format(values):
+    largest = max(values, default=0)
+    for limit, fmt in FREQUENCY_FORMATS:
+        if largest <= limit:
+            return fmt
+    raise ValueError("Frequency map value too large to pack")
+
+
+def encode_frequency_map(freq):
+    """Pack a {char: count} map into the compact binary form."""
+    code_points = [ord(ch) for ch in freq]
+    counts = list(freq.values())
+    cp_fmt, count_fmt = _smallest_format(code_points), _smallest_format(counts)
+    n = len(code_points)
+    return (cp_fmt + count_fmt).encode() + struct.pack(f"<{n}{cp_fmt}{n}{count_fmt}", *code_points, *counts)
+
+
+def decode_frequency_map(blob):
+    """Inverse of encode_frequency_map()."""
+    blob = bytes(blob)  # some backends return memoryview
+    cp_fmt, count_fmt = chr(blob[0]), chr(blob[1])
+    n = (len(blob) - 2) // (struct.calcsize(cp_fmt) + struct.calcsize(count_fmt))
+    values = struct.unpack_from(f"<{n}{cp_fmt}{n}{count_fmt}", blob, 2)
+    return dict(zip(map(chr, values[:n]), values[n:]))
+
+
+def compact_frequency_maps():
+    """Whether new rows store the frequency map in the binary column."""
+    return getattr(settings, "ANALYZER_COMPACT_FREQUENCY_MAP", False)
+
+
+class AnalyzedStringManager(models.Manager):
+    """Shard-aware manager: lookups by id go to the shard holding the id."""
+
+    def for_id(self, pk, primary=False):
+        """
+        Queryset on the database holding the string with primary key `pk`.
+        `primary=True` reads from the write database rather than a replica,
+        for checks that decide a write.
+        """
+        alias = sharding.shard_for(pk)
+        if alias is None and primary:
+            alias = router.db_for_write(self.model)
+        return self.using(alias)
+
+    def get_many(self, ids):
+        """{id: obj} for the given primary keys that exist, one query per shard."""
+        found = {}
+        for alias, group in sharding.group_by_shard(ids).items():
+            found.update((obj.id, obj) for obj in self.using(alias).filter(id__in=group))
+        return found
+
+    def bulk_analyze(self, values, batch_size=1000):
+        """
+        Analyze many values and insert the new ones with batched INSERTs.
+
+        Every value goes through the same validation and property computation
+        as `AnalyzedString.save()`. Rows already in the table (or repeated
+        within `values`) are skipped via `ignore_conflicts`.
+
+        Returns a list with one `(status, obj_or_error)` tuple per input value,
+        in input order, where status is "created", "duplicate" or "invalid".
+        """
+        results = []
+        pending = {}  # hash -> obj, first occurrence wins
+
+        for value in values:
+            obj = self.model(value=value)
+            try:
+                obj.clean()
+            except ValidationError as e:
+                results.append(("invalid", " ".join(e.messages)))
+                continue
+            obj.id = compute_sha256(obj.value)
+            if obj.id in pending:
+                results.append(("duplicate", pending[obj.id]))
+                continue
+            pending[obj.id] = obj
+            results.append(("created", obj))
+
+        # One lookup per batch (and shard) to tell new rows from rows already
+        # stored, on the write database: a lagging replica would miss rows
+        shard_ids = {
+            alias or router.db_for_write(self.model): ids
+            for alias, ids in sharding.group_by_shard(pending).items()
+        }
+        existing = set()
+        for using, ids in shard_ids.items():
+            for start in range(0, len(ids), batch_size):
+                existing.update(
+                    self.using(using).filter(id__in=ids[start:start + batch_size]).values_list("id", flat=True)
+                )
+
+        # Only rows that will actually be inserted need their properties
+        new_objs = [obj for hash_id, obj in pending.items() if hash_id not in existing]
+        for obj, properties in zip(new_objs, executor.analyze_batch([obj.value for obj in new_objs])):
+            obj.analyze(properties)
+
+        # Each shard's rows (with their index rows) commit in their own transaction
+        for using, ids in shard_ids.items():
+            shard_objs = [pending[hash_id] for hash_id in ids if hash_id not in existing]
+            with transaction.atomic(using=using):
+                self.using(using).bulk_create(shard_objs, batch_size=batch_size, ignore_conflicts=True)
+                inserted = self._inserted(shard_objs, using, batch_size)
+                # Rows another request stored since the lookup above were skipped
+                inserted_ids = {obj.id for obj in inserted}
+                existing.update(obj.id for obj in shard_objs if obj.id not in inserted_ids)
+                if inserted:
+                    strings_created.send(sender=self.model, instances=inserted, using=using)
+
+        return [
+            ("duplicate", item) if status == "created" and item.id in existing else (status, item)
+            for status, item in results
+        ]
+
+    def _inserted(self, objs, using, batch_size):
+        """
+        The objects of `objs` that bulk_create(ignore_conflicts=True) actually
+        inserted: the stored row with their id carries their own created_at.
+        """
+        stored = {}
+        for start in range(0, len(objs), batch_size):
+            ids = [obj.id for obj in objs[start:start + batch_size]]
+            stored.update(self.using(using).filter(id__in=ids).values_list("id", "created_at"))
+        return [obj for obj in objs if stored.get(obj.id) == obj.created_at]
+
+
 class AnalyzedString(models.Model):
     # Using sha256 as the primary key
     id = models.CharField(max_length=64, primary_key=True, editable=False)
-    value = models.CharField(unique=True, max_length=255)  # prevent duplicate strings
+    # Any length; duplicates are prevented by the sha256 primary key, so the
+    # raw value needs no (large) unique index of its own
+    value = models.TextField()
     length = models.IntegerField()
     is_palindrome = models.BooleanField()
     unique_characters = models.IntegerField()
     word_count = models.IntegerField()
-    character_frequency_map = models.JSONField()
+    # The frequency map lives in exactly one of these (see character_frequency_map)
+    character_frequency_json = models.JSONField(null=True, db_column="character_frequency_map")
+    character_frequency_blob = models.BinaryField(null=True)
+    char_mask = models.BigIntegerField(default=0)  # presence bits, see CHAR_MASK_ALPHABET
+    anagram_key = models.CharField(max_length=64, default="")  # see compute_anagram_key
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = AnalyzedStringManager()
+
     class Meta:
         indexes = [
-            models.Index(fields=["is_palindrome"]),
+            # Composite indexes follow the filter combinations clients send
+            # (see bench_queries): equality columns first, the length range last
+            models.Index(fields=["is_palindrome", "length"]),
             models.Index(fields=["length"]),
-            models.Index(fields=["word_count"]),
-            
+            models.Index(fields=["word_count", "is_palindrome", "length"]),
+            models.Index(fields=["created_at", "id"]),  # keyset pagination
+            models.Index(fields=["anagram_key"]),
         ]
         verbose_name = "Analyzed String"
 
+    _decoded_frequency_map = None
+
+    @property
+    def character_frequency_map(self):
+        """
+        The {char: count} map, read from the JSON column or decoded from the
+        binary one on first access.
+        """
+        if self.character_frequency_json is not None:
+            return self.character_frequency_json
+        if self._decoded_frequency_map is None and self.character_frequency_blob is not None:
+            self._decoded_frequency_map = decode_frequency_map(self.character_frequency_blob)
+        return self._decoded_frequency_map
+
+    @character_frequency_map.setter
+    def character_frequency_map(self, freq):
+        if compact_frequency_maps():
+            self.character_frequency_json = None
+            self.character_frequency_blob = encode_frequency_map(freq)
+        else:
+            self.character_frequency_json = freq
+            self.character_frequency_blob = None
+        self._decoded_frequency_map = freq
+
     def clean(self):
         """Validate value before saving."""
         if not isinstance(self.value, str):
@@ -38,32 +282,203 @@ class AnalyzedString(models.Model):
         if not self.value.strip():
             raise ValidationError("The 'value' field cannot be empty.")
 
-    def save(self, *args, **kwargs):
-        """Compute and populate properties automatically before saving."""
+    def analyze(self, properties=None):
+        """
+        Validate the value and populate the hash and computed properties.
+        `properties` (an engine.Properties) can be passed in when it was
+        already computed, e.g. by executor.analyze_batch().
+        """
         self.clean()  # run validation
 
         # Compute hash (used as ID)
         if not self.id:  # only set ID on first save to avoid PK change
             self.id = compute_sha256(self.value)
 
-        text = self.value
-        text_lower = text.lower()
+        # --- Compute properties (frequency map is case-insensitive) ---
+        if properties is None:
+            properties = executor.analyze(self.value)
+        self.length = properties.length
+        self.is_palindrome = properties.is_palindrome
+        self.unique_characters = properties.unique_characters
+        self.word_count = properties.word_count
+        self.character_frequency_map = properties.character_frequency_map
+        self.char_mask, _ = compute_char_mask(properties.character_frequency_map)
+        self.anagram_key = compute_anagram_key(properties.character_frequency_map)
+
+    def save(self, *args, properties=None, **kwargs):
+        """
+        Compute and populate properties automatically before saving.
+        `properties` can be passed when already computed (see analyze()).
+        A new instance is always INSERTed: the id is the value's sha256, so
+        saving an existing value raises IntegrityError instead of updating
+        the stored row.
+        """
+        self.analyze(properties)
+        adding = self._state.adding
+        if adding:
+            kwargs.setdefault("force_insert", True)
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
 
-        # --- Compute properties ---
-        self.length = len(text)
-        self.is_palindrome = text_lower == text_lower[::-1]
-        self.unique_characters = len(set(text_lower))
-        self.word_count = len(text.split())
+        # Save to DB, together with the derived index rows
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if adding:
+                strings_created.send(sender=type(self), instances=[self], using=using)
 
-        # Character frequency map (case-insensitive)
-        freq = {}
-        for ch in text_lower:
-            freq[ch] = freq.get(ch, 0) + 1
-        self.character_frequency_map = freq
+    def insert(self, properties=None):
+        """
+        Insert the string unless a row with its id already exists, in one
+        INSERT ... ON CONFLICT DO NOTHING statement (INSERT OR IGNORE on
+        SQLite, INSERT IGNORE on MySQL) instead of an existence check, a
+        save() and a caught IntegrityError. Returns True if the row was
+        created; only then are its index rows written. On MySQL any warning
+        other than the duplicate key is raised as a DatabaseError.
+        """
+        self.analyze(properties)
+        using = router.db_for_write(type(self), instance=self)
+        query = sql.InsertQuery(type(self), on_conflict=OnConflict.IGNORE)
+        query.insert_values(self._meta.concrete_fields, [self])
 
-        # Save to DB
-        super().save(*args, **kwargs)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                for statement, params in query.get_compiler(using=using).as_sql():
+                    cursor.execute(statement, params)
+                created = cursor.rowcount > 0
+                if connections[using].vendor == "mysql":
+                    # INSERT IGNORE also turns every other error (out of range,
+                    # truncated data, ...) into a warning and stores the row anyway
+                    cursor.execute("SHOW WARNINGS")
+                    for level, code, message in cursor.fetchall():
+                        if code != MYSQL_DUPLICATE_ENTRY:
+                            raise DatabaseError(f"{level} {code}: {message}")
+            if created:
+                self._state.adding = False
+                self._state.db = using
+                strings_created.send(sender=type(self), instances=[self], using=using)
+        return created
 
     def __str__(self):
         """Readable representation in admin panel."""
         return f"{self.value[:30]}{'...' if len(self.value) > 30 else ''}"
+
+
+class CharacterOccurrence(models.Model):
+    """
+    Inverted character index: one row per distinct (lowercased) character of
+    each analyzed string, so character filters are index seeks instead of
+    JSON scans. Rows are written when the string is created (see
+    analyzer.indexing) and removed with it via the cascade.
+    """
+    code_point = models.PositiveIntegerField()
+    string = models.ForeignKey(AnalyzedString, on_delete=models.CASCADE, related_name="character_occurrences")
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["string", "code_point"], name="unique_string_code_point"),
+        ]
+        indexes = [
+            # Covers "strings containing c at least n times" without touching the table
+            models.Index(fields=["code_point", "count", "string"]),
+        ]
+
+    @classmethod
+    def for_strings(cls, instances):
+        """Build (unsaved) index rows for the given analyzed strings."""
+        return [
+            cls(code_point=ord(ch), string_id=obj.id, count=count)
+            for obj in instances
+            for ch, count in obj.character_frequency_map.items()
+        ]
+
+    def __str__(self):
+        return f"{chr(self.code_point)!r} x{self.count} in {self.string_id[:8]}"
+
+
+class Trigram(models.Model):
+    """
+    Trigram index for substring, prefix and suffix filters: one row per
+    distinct trigram of each analyzed string (see compute_trigrams), or a
+    single TRIGRAM_UNINDEXED row for strings longer than TRIGRAM_MAX_LENGTH.
+    Written with the string (see analyzer.indexing) and removed with it via
+    the cascade.
+    """
+    gram = models.CharField(max_length=3)
+    string = models.ForeignKey(AnalyzedString, on_delete=models.CASCADE, related_name="trigrams")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["string", "gram"], name="unique_string_trigram"),
+        ]
+        indexes = [
+            # Posting lists: the strings containing a gram, without touching the table
+            models.Index(fields=["gram", "string"]),
+        ]
+
+    @classmethod
+    def for_strings(cls, instances):
+        """Build (unsaved) index rows for the given analyzed strings."""
+        return [
+            cls(gram=gram, string_id=obj.id)
+            for obj in instances
+            for gram in (
+                compute_trigrams(obj.value) if obj.length <= TRIGRAM_MAX_LENGTH else [TRIGRAM_UNINDEXED]
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.gram!r} in {self.string_id[:8]}"
+
+
+class SimilarityBand(models.Model):
+    """
+    LSH index for near-duplicate lookup: one row per MinHash band of each
+    analyzed string no longer than SIMILARITY_MAX_LENGTH (see
+    analyzer.minhash). Strings sharing a (band, bucket) are candidates for
+    /strings/<value>/similar. Written with the string (see
+    analyzer.indexing) and removed with it via the cascade.
+    """
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    string = models.ForeignKey(AnalyzedString, on_delete=models.CASCADE, related_name="similarity_bands")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["string", "band"], name="unique_string_band"),
+        ]
+        indexes = [
+            models.Index(fields=["band", "bucket", "string"]),
+        ]
+
+    @classmethod
+    def for_strings(cls, instances):
+        """Build (unsaved) index rows for the given analyzed strings."""
+        return [
+            cls(band=band, bucket=bucket, string_id=obj.id)
+            for obj in instances
+            if obj.length <= SIMILARITY_MAX_LENGTH
+            for band, bucket in minhash.band_buckets(minhash.signature(minhash.shingles(obj.value)))
+        ]
+
+    def __str__(self):
+        return f"band {self.band}: {self.bucket} for {self.string_id[:8]}"
+
+
+class StatBucket(models.Model):
+    """
+    One counter of the aggregate statistics served by /strings/stats, e.g.
+    ("length", 5) = number of strings of length 5. Kept up to date on every
+    create and delete (see analyzer.stats), so reading the statistics costs
+    the same whatever the size of the table.
+    """
+    kind = models.CharField(max_length=16)
+    key = models.BigIntegerField()  # length, word count, code point, or 0/1
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "key"], name="unique_stat_bucket"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}[{self.key}] = {self.count}"
@@ -1,6 +1,149 @@
 import re
+from functools import lru_cache
 from typing import Dict, Any
 
+# Parsed results are memoized per normalized query; clients reuse a handful of phrasings
+PARSE_CACHE_SIZE = 1024
+
+COUNT_BOUNDS = {"at least": "gte", "at most": "lte", "exactly": "exact"}
+
+# Length bounds take an explicit character unit or none at all; a number
+# followed by another unit ("3 words", "3 times") is not a length
+LENGTH_UNIT = r"(?:\ (?:characters?|chars?)\b|(?!\ (?:words?|times?)\b))"
+
+# The whole grammar is one precompiled alternation scanned left to right with
+# finditer, so each phrase consumes its words once and cannot be matched again
+# by a more generic rule (e.g. "10" in "longer than 10 characters" is not also
+# read as "10 characters"). Order matters: longer phrases come first.
+GRAMMAR = re.compile(
+    rf"""
+      (?P<not_palindrome>\b(?:not|non)[ -]?palindrom\w*)
+    | (?P<palindrome>\bpalindrom\w*)
+    | \bcontain(?:s|ing)?\ (?P<any_of>any\ of\ )?the\ letters\ (?P<letters>\w(?:(?:,|,?\ and|,?\ or)?\ \w)+)\b
+        (?:\ (?P<letters_bound>at\ least|at\ most|exactly)\ (?P<letters_n>\d+)\ times?\b)?
+    | \bcontain(?:s|ing)?\ the\ letter\ (?P<letter>\w)\b
+        (?:\ (?P<letter_bound>at\ least|at\ most|exactly)\ (?P<letter_n>\d+)\ times?\b)?
+    | \bletter\ (?P<count_char>\w)\ (?P<count_bound>at\ least|at\ most|exactly)\ (?P<count_n>\d+)\ times?\b
+    | \b(?P<plural_bound>at\ least|at\ most|exactly)\ (?P<plural_n>\d+)\ (?P<plural_char>\w)'s\b
+    | \bcontain(?:s|ing)?\ (?:the\ (?:word|substring|text)\ (?P<substring>"[^"]+"|'[^']+'|\S+)
+        | (?P<quoted_substring>"[^"]+"|'[^']+'))
+    | \b(?:start(?:s|ing)?|begin(?:s|ning)?)\ with\ (?P<prefix>"[^"]+"|'[^']+'|\S+)
+    | \bend(?:s|ing)?\ with\ (?P<suffix>"[^"]+"|'[^']+'|\S+)
+    | \banagrams?\ of\ (?P<anagram>"[^"]+"|'[^']+'|\S+)
+    | (?P<first_vowel>\bfirst\ vowel\b)
+    | (?P<word_bounds>\b(?:between\ \d+\ and|at\ least|at\ most|longer\ than\ or\ equal\ to
+        |(?:longer|more|shorter|less|fewer)\ than)\ \d+\ (?:words?|times?)\b)
+    | \bbetween\ (?P<between_lo>\d+)\ and\ (?P<between_hi>\d+){LENGTH_UNIT}
+    | \bexactly\ (?P<exact_words>\d+)\ words?\b
+    | \bexactly\ (?P<exact_length>\d+)\ characters?\b
+    | \b(?P<words>\d+)\ words?\b
+    | (?P<single_word>\b(?:single|one)[ -]word\b)
+    | \b(?:longer\ than\ or\ equal\ to|at\ least)\ (?P<min_inclusive>\d+){LENGTH_UNIT}
+    | \b(?:longer|more)\ than\ (?P<min_exclusive>\d+){LENGTH_UNIT}
+    | \b(?:shorter|less|fewer)\ than\ (?P<max_exclusive>\d+){LENGTH_UNIT}
+    | \bat\ most\ (?P<max_inclusive>\d+){LENGTH_UNIT}
+    | (?P<length>\d+)\ ?characters?\b
+    """,
+    re.VERBOSE,
+)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so equivalent phrasings share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def _unquote(text):
+    if len(text) > 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    return text
+
+
+def _set_min(parsed, n):
+    parsed["min_length"] = max(n, parsed.get("min_length", n))
+
+
+def _set_max(parsed, n):
+    parsed["max_length"] = min(n, parsed.get("max_length", n))
+
+
+def _apply(m, parsed):
+    """Fold one grammar match into the parsed filters."""
+    g = m.groupdict()
+
+    if g["not_palindrome"]:
+        parsed["is_palindrome"] = False
+    elif g["palindrome"]:
+        parsed["is_palindrome"] = True
+    elif g["letters"]:
+        letters = "".join(re.findall(r"\b\w\b", g["letters"]))
+        parsed["contains_any" if g["any_of"] else "contains_all"] = letters
+        if g["letters_bound"]:
+            if g["any_of"]:
+                raise ValueError("Counts cannot be combined with 'any of the letters'")
+            op = COUNT_BOUNDS[g["letters_bound"]]
+            for letter in letters:
+                parsed[f"char_count[{letter}]__{op}"] = int(g["letters_n"])
+    elif g["word_bounds"]:
+        # Only exact word counts can be filtered; never read these as lengths
+        raise ValueError("Unsupported word-count or repetition bound")
+    elif g["letter"]:
+        parsed["contains_character"] = g["letter"]
+        if g["letter_bound"]:
+            op = COUNT_BOUNDS[g["letter_bound"]]
+            parsed[f"char_count[{g['letter']}]__{op}"] = int(g["letter_n"])
+    elif g["count_char"]:
+        op = COUNT_BOUNDS[g["count_bound"]]
+        parsed[f"char_count[{g['count_char']}]__{op}"] = int(g["count_n"])
+    elif g["plural_char"]:
+        op = COUNT_BOUNDS[g["plural_bound"]]
+        parsed[f"char_count[{g['plural_char']}]__{op}"] = int(g["plural_n"])
+    elif g["substring"] or g["quoted_substring"]:
+        parsed["contains"] = _unquote(g["substring"] or g["quoted_substring"])
+    elif g["prefix"]:
+        parsed["startswith"] = _unquote(g["prefix"])
+    elif g["suffix"]:
+        parsed["endswith"] = _unquote(g["suffix"])
+    elif g["anagram"]:
+        parsed["is_anagram_of"] = _unquote(g["anagram"])
+    elif g["first_vowel"]:
+        parsed["contains_character"] = "a"
+    elif g["between_lo"]:
+        lo, hi = sorted((int(g["between_lo"]), int(g["between_hi"])))
+        _set_min(parsed, lo)
+        _set_max(parsed, hi)
+    elif g["exact_words"]:
+        parsed["word_count"] = int(g["exact_words"])
+    elif g["exact_length"]:
+        _set_min(parsed, int(g["exact_length"]))
+        _set_max(parsed, int(g["exact_length"]))
+    elif g["words"]:
+        parsed["word_count"] = int(g["words"])
+    elif g["single_word"]:
+        parsed["word_count"] = 1
+    elif g["min_inclusive"]:
+        _set_min(parsed, int(g["min_inclusive"]))
+    elif g["min_exclusive"]:
+        _set_min(parsed, int(g["min_exclusive"]) + 1)
+    elif g["max_exclusive"]:
+        _set_max(parsed, int(g["max_exclusive"]) - 1)
+    elif g["max_inclusive"]:
+        _set_max(parsed, int(g["max_inclusive"]))
+    elif g["length"]:
+        _set_min(parsed, int(g["length"]))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(q: str):
+    parsed = {}
+    for m in GRAMMAR.finditer(q):
+        _apply(m, parsed)
+    if not parsed:
+        raise ValueError("Unable to parse natural language query")
+    # Immutable so the cached value cannot be changed by a caller
+    return tuple(parsed.items())
+
+
 def parse_natural_language_query(query: str) -> Dict[str, Any]:
     """
     Parse simple English phrases into filter params.
@@ -8,6 +151,11 @@ def parse_natural_language_query(query: str) -> Dict[str, Any]:
       "all single word palindromic strings" → {"word_count": 1, "is_palindrome": True}
       "strings longer than 10 characters"   → {"min_length": 11}
       "strings containing the letter z"     → {"contains_character": "z"}
+      "between 5 and 10 characters"         → {"min_length": 5, "max_length": 10}
+      "exactly 3 words that are not palindromes" → {"word_count": 3, "is_palindrome": False}
+      "strings containing the word foo"     → {"contains": "foo"}
+      "strings starting with 'pre'"         → {"startswith": "pre"}
+      "anagrams of listen"                  → {"is_anagram_of": "listen"}
 
     Raises:
       ValueError if query cannot be parsed.
@@ -15,46 +163,4 @@ def parse_natural_language_query(query: str) -> Dict[str, Any]:
     if not isinstance(query, str) or not query.strip():
         raise ValueError("Query must be a non-empty string")
 
-    q = query.lower().strip()
-    parsed = {}
-
-    # --- Palindrome detection ---
-    if re.search(r"\bpalindrom", q):
-        parsed["is_palindrome"] = True
-
-    # --- Word count ---
-    if re.search(r"\b(single|one)\s+word\b", q):
-        parsed["word_count"] = 1
-
-    # --- Length filters (handle >= first) ---
-    m = re.search(r"longer than or equal to (\d+)", q)
-    if m:
-        parsed["min_length"] = int(m.group(1))
-    else:
-        m = re.search(r"longer than (\d+)", q)
-        if m:
-            parsed["min_length"] = int(m.group(1)) + 1
-
-    # --- Handle "at most" / "less than" phrases ---
-    m = re.search(r"(?:less than|at most)\s+(\d+)", q)
-    if m:
-        parsed["max_length"] = int(m.group(1)) - 1
-
-    # --- Generic "N characters" fallback ---
-    m = re.search(r"(\d+)\s*characters?", q)
-    if m and not any(kw in q for kw in ["longer", "shorter", "less", "at most"]):
-        parsed["min_length"] = int(m.group(1))
-
-    # --- Character containment ---
-    if "first vowel" in q:
-        parsed["contains_character"] = "a"
-    else:
-        m = re.search(r"contain(?:ing)? the letter (\w)", q)
-        if m:
-            parsed["contains_character"] = m.group(1)
-
-    # --- Final check ---
-    if not parsed:
-        raise ValueError("Unable to parse natural language query")
-
-    return parsed
+    return dict(_parse_normalized(normalize_query(query)))
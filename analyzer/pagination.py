@@ -0,0 +1,100 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from . import sharding
+
+
+def ordering_key(row):
+    """Sort key of a model instance or .values() row in KeysetPagination.ordering."""
+    if isinstance(row, dict):
+        return row["created_at"], row["id"]
+    return row.created_at, row.id
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered by (created_at, id).
+
+    Each page is fetched with `WHERE (created_at, id) > cursor ORDER BY
+    created_at, id LIMIT n + 1`, so the cost of a page does not grow with
+    its depth and rows inserted meanwhile never shift page boundaries.
+
+    Query params:
+      - limit (int, default PAGE_SIZE, capped at max_limit)
+      - cursor (opaque token taken from the previous page's "next" link)
+    """
+    ordering = ("created_at", "id")
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+    max_limit = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # With sharded storage every shard returns its own first rows after
+        # the cursor and the page is the smallest of them
+        page_queryset = self.page_queryset(queryset, request)
+        pages = sharding.fan_out(lambda alias: list(page_queryset.using(alias)))
+        return self.finish_page(list(sharding.merge(pages, ordering_key, self.limit + 1)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset() for async views, using async iteration."""
+        page_queryset = self.page_queryset(queryset, request)
+        pages = [[row async for row in page_queryset.using(alias)] for alias in sharding.shards()]
+        return self.finish_page(list(sharding.merge(pages, ordering_key, self.limit + 1)))
+
+    def page_queryset(self, queryset, request):
+        """The ordered, cursor-filtered slice holding the page plus one extra row."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.next_cursor = None
+
+        queryset = queryset.order_by(*self.ordering)
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            created_at, pk = self.decode_cursor(encoded)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+        # One extra row tells whether there is a next page
+        return queryset[:self.limit + 1]
+
+    def finish_page(self, page):
+        if len(page) > self.limit:
+            page = page[:self.limit]
+            self.next_cursor = self.encode_cursor(*ordering_key(page[-1]))
+        return page
+
+    def get_limit(self, request):
+        default = api_settings.PAGE_SIZE or 50
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(limit, self.max_limit))
+
+    def get_next_link(self):
+        return self.link_to(self.request, self.next_cursor)
+
+    def link_to(self, request, cursor):
+        """URL of the page starting after `cursor` (None if there is no such page)."""
+        if cursor is None:
+            return None
+        return replace_query_param(request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def encode_cursor(self, created_at, pk):
+        token = f"{created_at.isoformat()}|{pk}".encode("utf-8")
+        return base64.urlsafe_b64encode(token).decode("ascii")
+
+    def decode_cursor(self, encoded):
+        try:
+            token = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            created_at, pk = token.split("|", 1)
+            return datetime.fromisoformat(created_at), pk
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,85 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from . import engine
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parser for newline-delimited JSON bodies (one JSON document per line).
+    Blank lines are skipped. Returns a list of the decoded documents.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        items = []
+        for lineno, raw_line in enumerate(stream, start=1):
+            line = raw_line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {lineno} - {exc}")
+        return items
+
+
+class PlainTextParser(BaseParser):
+    """
+    Parser for text/plain bodies: the whole body is the string to analyze.
+    Returns {"value": text}.
+
+    Bodies larger than ANALYZER_STREAM_THRESHOLD bytes are decoded and
+    analyzed chunk by chunk while they are read; the computed engine.Properties
+    are returned under "properties" so the view does not analyze them again.
+    """
+    media_type = "text/plain"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        request = parser_context.get("request")
+        max_bytes = getattr(settings, "ANALYZER_MAX_TEXT_BYTES", 8 * 1024 * 1024)
+        threshold = getattr(settings, "ANALYZER_STREAM_THRESHOLD", 64 * 1024)
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0) if request else 0
+        except ValueError:
+            content_length = 0
+
+        if content_length > max_bytes:
+            raise ParseError(f"Text body too large (max {max_bytes} bytes)")
+
+        try:
+            if content_length <= threshold:
+                return {"value": stream.read().decode(encoding)}
+            return self.parse_stream(stream, encoding, max_bytes)
+        except (LookupError, UnicodeDecodeError) as exc:
+            raise ParseError(f"Text parse error - {exc}")
+
+    def parse_stream(self, stream, encoding, max_bytes):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        analyzer = engine.StreamAnalyzer()
+        chunks = []
+        size = 0
+        while True:
+            raw = stream.read(READ_CHUNK_SIZE)
+            size += len(raw)
+            if size > max_bytes:
+                raise ParseError(f"Text body too large (max {max_bytes} bytes)")
+            chunk = decoder.decode(raw, final=not raw)
+            analyzer.feed(chunk)
+            chunks.append(chunk)
+            if not raw:
+                break
+        text = "".join(chunks)
+        del chunks
+        return {"value": text, "properties": analyzer.result(text)}
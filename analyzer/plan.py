@@ -0,0 +1,277 @@
+"""
+Query-plan layer shared by every endpoint that filters strings.
+
+Both GET /strings/ (query params, validated by AnalyzedStringFilter) and the
+natural-language endpoint (parsed phrases) compile their input into a
+FilterPlan: a canonical, hashable description of the filters. Equivalent
+inputs compile to equal plans (e.g. contains_character=e and
+contains_all=e, or min_char_count=e:3 and char_count[e]__gte=3), so results
+can be cached per plan and both endpoints run exactly the same SQL.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, F, Min, Q
+
+from .models import (
+    TRIGRAM_END, TRIGRAM_START, TRIGRAM_UNINDEXED, CharacterOccurrence, Trigram, anagram_key_of,
+    compute_char_mask,
+)
+
+CHAR_COUNT_OPS = {
+    "gte": lambda count, n: count >= n,
+    "gt": lambda count, n: count > n,
+    "lte": lambda count, n: count <= n,
+    "lt": lambda count, n: count < n,
+    "exact": lambda count, n: count == n,
+}
+
+# Most to least common characters in typical text; anything not listed is
+# treated as rarer than all of these. Used to pick the most selective character.
+CHARACTER_FREQUENCY_ORDER = " etaoinshrdlcumwfgypbvkjxqz"
+
+
+def filter_by_character(queryset, ch, min_count=1):
+    """
+    Keep strings whose character_frequency_map has `ch` at least `min_count`
+    times. Served by the CharacterOccurrence (code_point, count, string) index.
+    """
+    occurrences = CharacterOccurrence.objects.filter(code_point=ord(ch))
+    if min_count > 1:
+        occurrences = occurrences.filter(count__gte=min_count)
+    return queryset.filter(id__in=occurrences.values("string_id"))
+
+
+def filter_by_char_count(queryset, ch, op, n):
+    """
+    Keep strings where the count of `ch` satisfies `op` against `n`, counting
+    a missing character as 0 (so char_count[e]__lt=2 includes strings without e).
+    """
+    occurrences = CharacterOccurrence.objects.filter(code_point=ord(ch))
+    if CHAR_COUNT_OPS[op](0, n):
+        # Zero matches: drop the strings whose stored count fails instead
+        failing = occurrences.exclude(**{f"count__{op}": n})
+        return queryset.exclude(id__in=failing.values("string_id"))
+    return queryset.filter(id__in=occurrences.filter(**{f"count__{op}": n}).values("string_id"))
+
+
+def filter_contains_all(queryset, chars):
+    """
+    Keep strings containing every character in `chars`. Characters covered by
+    char_mask become one bitwise test; any others fall back to the index.
+    """
+    mask, unmasked = compute_char_mask(set(chars))
+    if mask:
+        queryset = queryset.alias(_all_bits=F("char_mask").bitand(mask)).filter(_all_bits=mask)
+    for ch in unmasked:
+        queryset = filter_by_character(queryset, ch)
+    return queryset
+
+
+def filter_contains_any(queryset, chars):
+    """Keep strings containing at least one character in `chars`."""
+    mask, unmasked = compute_char_mask(set(chars))
+    condition = Q()
+    if mask:
+        queryset = queryset.alias(_any_bits=F("char_mask").bitand(mask))
+        condition |= Q(_any_bits__gt=0)
+    if unmasked:
+        occurrences = CharacterOccurrence.objects.filter(code_point__in=[ord(ch) for ch in unmasked])
+        condition |= Q(id__in=occurrences.values("string_id"))
+    return queryset.filter(condition)
+
+
+# Substring filters: the value lookup that verifies a candidate, and how the
+# needle is padded to get its trigrams (see compute_trigrams)
+SUBSTRING_FILTERS = {
+    "contains": ("value__icontains", "{}"),
+    "startswith": ("value__istartswith", TRIGRAM_START + "{}"),
+    "endswith": ("value__iendswith", "{}" + TRIGRAM_END),
+}
+
+# Intersecting a few posting lists already leaves few candidates; the
+# verification step handles the rest of a long needle
+MAX_QUERY_TRIGRAMS = 8
+
+
+def substring_trigrams(name, needle):
+    """The distinct trigrams every match of the `name` filter contains (maybe none)."""
+    padded = SUBSTRING_FILTERS[name][1].format(needle.lower())
+    grams = sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+    if len(grams) > MAX_QUERY_TRIGRAMS:
+        step = len(grams) / MAX_QUERY_TRIGRAMS
+        grams = [grams[int(i * step)] for i in range(MAX_QUERY_TRIGRAMS)]
+    return grams
+
+
+def filter_by_substring(queryset, name, needle):
+    """
+    Keep strings whose value contains / starts with / ends with `needle`
+    (case-insensitive), for `name` in SUBSTRING_FILTERS.
+
+    Candidates are the strings whose Trigram posting lists contain every
+    trigram of the needle, plus the unindexed long strings, found in one
+    GROUP BY over the (gram, string) index. Only the candidates are then
+    checked against the value itself. Needles too short to have a trigram
+    fall back to the plain LIKE.
+    """
+    lookup = SUBSTRING_FILTERS[name][0]
+    grams = substring_trigrams(name, needle)
+    if grams:
+        candidates = (
+            Trigram.objects.filter(gram__in=[*grams, TRIGRAM_UNINDEXED])
+            .values("string_id")
+            .annotate(matched=Count("gram"), lowest=Min("gram"))
+            .filter(Q(matched=len(grams)) | Q(lowest=TRIGRAM_UNINDEXED))
+            .values("string_id")
+        )
+        queryset = queryset.filter(id__in=candidates)
+    return queryset.filter(**{lookup: needle})
+
+
+def character_rarity(ch):
+    """Higher is rarer (more selective)."""
+    rank = CHARACTER_FREQUENCY_ORDER.find(ch)
+    return len(CHARACTER_FREQUENCY_ORDER) if rank < 0 else rank
+
+
+def _as_int(name, value):
+    if isinstance(value, Decimal) and value != value.to_integral_value():
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _single_char(name, value):
+    value = str(value)
+    if len(value) != 1:
+        raise ValueError(f"{name} must be a single character")
+    return value
+
+
+class FilterPlan:
+    """
+    Canonical, hashable set of filters plus the logic to run it.
+
+    Canonical filters:
+      - is_palindrome: bool
+      - min_length / max_length / word_count: int
+      - contains_all / contains_any: sorted string of distinct characters
+      - char_count: sorted tuple of (char, op, n)
+      - contains / startswith / endswith: lowercased string
+      - anagram_key: anagram key of the is_anagram_of value (see compute_anagram_key)
+    """
+    __slots__ = ("filters", "key")
+
+    def __init__(self, filters):
+        self.filters = filters
+        self.key = tuple(sorted(filters.items()))
+
+    def __eq__(self, other):
+        return isinstance(other, FilterPlan) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"FilterPlan({dict(self.key)!r})"
+
+    @classmethod
+    def from_values(cls, values, char_counts=()):
+        """
+        Build a plan from already-typed filter values (as produced by the
+        AnalyzedStringFilter form) plus (char, op, n) char_count triples.
+        Raises ValueError on values the form could not check.
+        """
+        filters = {}
+        if values.get("is_palindrome") is not None:
+            filters["is_palindrome"] = bool(values["is_palindrome"])
+        for name in ("min_length", "max_length", "word_count"):
+            if values.get(name) is not None:
+                filters[name] = _as_int(name, values[name])
+
+        contains_all = set(values.get("contains_all") or "")
+        if values.get("contains_character"):
+            contains_all.add(_single_char("contains_character", values["contains_character"]))
+        if contains_all:
+            filters["contains_all"] = "".join(sorted(contains_all))
+        if values.get("contains_any"):
+            filters["contains_any"] = "".join(sorted(set(values["contains_any"])))
+
+        for name in SUBSTRING_FILTERS:
+            if values.get(name):
+                filters[name] = str(values[name]).lower()
+
+        if values.get("is_anagram_of"):
+            filters["anagram_key"] = anagram_key_of(str(values["is_anagram_of"]))
+            if not filters["anagram_key"]:
+                raise ValueError("is_anagram_of must contain a letter or digit")
+
+        counts = set(char_counts)
+        if values.get("min_char_count"):
+            ch, sep, n = str(values["min_char_count"]).rpartition(":")
+            if not sep or len(ch) != 1:
+                raise ValueError("min_char_count must look like '<char>:<n>'")
+            counts.add((ch, "gte", max(_as_int("min_char_count count", n), 1)))
+        if counts:
+            filters["char_count"] = tuple(sorted(counts))
+
+        return cls(filters)
+
+    def cache_params(self):
+        """JSON-serializable form of the plan for cache keys."""
+        return [[name, list(value) if isinstance(value, tuple) else value] for name, value in self.key]
+
+    def has_conflict(self):
+        f = self.filters
+        return "min_length" in f and "max_length" in f and f["min_length"] > f["max_length"]
+
+    def driving_character(self):
+        """
+        The contains_all character to look up through the CharacterOccurrence
+        index, or None.
+
+        The bitmask test cannot use an index, so when nothing else in the plan
+        narrows the rows through an index (length, word_count, an anagram
+        key, a substring with trigrams or a count that excludes zero) the rarest required
+        character drives the query instead.
+        """
+        f = self.filters
+        if "contains_all" not in f:
+            return None
+        if any(name in f for name in ("min_length", "max_length", "word_count", "anagram_key")):
+            return None
+        if any(name in f and substring_trigrams(name, f[name]) for name in SUBSTRING_FILTERS):
+            return None
+        if any(not CHAR_COUNT_OPS[op](0, n) for _, op, n in f.get("char_count", ())):
+            return None
+        return max(f["contains_all"], key=character_rarity)
+
+    def apply(self, queryset):
+        f = self.filters
+        if "is_palindrome" in f:
+            queryset = queryset.filter(is_palindrome=f["is_palindrome"])
+        if "min_length" in f:
+            queryset = queryset.filter(length__gte=f["min_length"])
+        if "max_length" in f:
+            queryset = queryset.filter(length__lte=f["max_length"])
+        if "word_count" in f:
+            queryset = queryset.filter(word_count=f["word_count"])
+        if "anagram_key" in f:
+            queryset = queryset.filter(anagram_key=f["anagram_key"])
+        for ch, op, n in f.get("char_count", ()):
+            queryset = filter_by_char_count(queryset, ch, op, n)
+        if "contains_all" in f:
+            chars = f["contains_all"]
+            driver = self.driving_character()
+            if driver is not None:
+                queryset = filter_by_character(queryset, driver)
+                chars = chars.replace(driver, "")
+            queryset = filter_contains_all(queryset, chars)
+        if "contains_any" in f:
+            queryset = filter_contains_any(queryset, f["contains_any"])
+        for name in SUBSTRING_FILTERS:
+            if name in f:
+                queryset = filter_by_substring(queryset, name, f[name])
+        return queryset
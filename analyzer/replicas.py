@@ -0,0 +1,139 @@
+"""
+Read-replica routing with read-your-writes.
+
+With ANALYZER_READ_REPLICAS set to a list of database aliases, reads of the
+analyzer models (detail, list, natural-language, stats) go to a random
+replica and writes go to the primary ("default"). Replication lags, so a
+client that has just written is pinned to the primary for
+ANALYZER_READ_YOUR_WRITES_SECONDS: every successful POST / PUT / PATCH /
+DELETE response carries the pin's expiry time in a cookie and in the
+X-Primary-Until header. Later requests that send back either one read from
+the primary until it expires, so a POST followed by a GET of the new string
+never 404s. Clients without cookies can echo the header. Write requests
+themselves always read from the primary.
+
+The pin is held in a context variable set by ReadYourWritesMiddleware, so it
+follows the request into threads started through asgiref (async views,
+sync_to_async). Sharded storage (analyzer.sharding) routes the string
+tables itself; replicas then serve the other analyzer models only.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from . import sharding
+
+PIN_COOKIE = "analyzer_primary_until"
+PIN_HEADER = "X-Primary-Until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+pinned_to_primary = ContextVar("pinned_to_primary", default=False)
+
+
+def replicas():
+    return list(getattr(settings, "ANALYZER_READ_REPLICAS", ()))
+
+
+def cached_reads_allowed():
+    """
+    False while the current request is pinned: cached list pages and counts
+    may have been filled from a replica that had not seen its write yet.
+    """
+    return not pinned_to_primary.get()
+
+
+def pin_seconds():
+    return getattr(settings, "ANALYZER_READ_YOUR_WRITES_SECONDS", 5)
+
+
+def is_pinned(request, now=None):
+    """Whether `request` carries a pin (cookie or header) that has not expired."""
+    raw = request.headers.get(PIN_HEADER) or request.COOKIES.get(PIN_COOKIE)
+    try:
+        until = float(raw)
+    except (TypeError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    # A pin further ahead than one window (plus rounding) was not issued by us
+    return now < until <= now + pin_seconds() + 1
+
+
+def pin(response):
+    """Pin the client that receives `response` to the primary."""
+    until = f"{time.time() + pin_seconds():.3f}"
+    response[PIN_HEADER] = until
+    response.set_cookie(PIN_COOKIE, until, max_age=pin_seconds(), httponly=True, samesite="Lax")
+
+
+def _routed(model):
+    if not replicas() or model._meta.app_label != "analyzer":
+        return False
+    return not (sharding.enabled() and model._meta.label in sharding.SHARDED_MODELS)
+
+
+class ReplicaRouter:
+    """Analyzer reads go to a replica unless the current request is pinned."""
+
+    def db_for_read(self, model, **hints):
+        if not _routed(model) or pinned_to_primary.get():
+            return None
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        # Also for instances read from a replica (e.g. the object of a DELETE)
+        return DEFAULT_DB_ALIAS if _routed(model) else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        primary_and_replicas = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in primary_and_replicas and obj2._state.db in primary_and_replicas:
+            return True
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins clients to the primary after their own writes (see the module
+    docstring). Works for sync and async views.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = pinned_to_primary.set(self.reads_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            pinned_to_primary.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = pinned_to_primary.set(self.reads_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            pinned_to_primary.reset(token)
+        return self.process_response(request, response)
+
+    def reads_primary(self, request):
+        # Lookups made by a write (existence checks, the object to delete)
+        # must not see a lagging replica either
+        if not replicas():
+            return False
+        return request.method in WRITE_METHODS or is_pinned(request)
+
+    def process_response(self, request, response):
+        if replicas() and request.method in WRITE_METHODS and response.status_code < 400:
+            pin(response)
+        return response
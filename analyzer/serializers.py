@@ -1,5 +1,14 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import AnalyzedString
+from .models import AnalyzedString, decode_frequency_map
+
+CREATED_AT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+PROPERTY_FIELDS = ("length", "is_palindrome", "unique_characters", "word_count",
+                   "sha256_hash", "character_frequency_map")
+TOP_LEVEL_FIELDS = ("id", "value", "properties", "created_at")
 
 class AnalyzedStringPropertiesSerializer(serializers.Serializer):
     length = serializers.IntegerField()
@@ -18,7 +27,7 @@ class AnalyzedStringSerializer(serializers.ModelSerializer):
 
     properties = serializers.SerializerMethodField()
     id = serializers.CharField(read_only=True)
-    created_at = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ", read_only=True)
+    created_at = serializers.DateTimeField(format=CREATED_AT_FORMAT, read_only=True)
 
 
     class Meta:
@@ -36,6 +45,94 @@ class AnalyzedStringSerializer(serializers.ModelSerializer):
             "character_frequency_map": obj.character_frequency_map,
         }
 
+class StringRowSerializer:
+    """
+    Fast path for list responses: reads `.values()` rows and builds the same
+    dicts AnalyzedStringSerializer produces, without per-row field objects.
+
+    `fields` optionally restricts the output to some of TOP_LEVEL_FIELDS
+    and/or individual PROPERTY_FIELDS (which then appear under "properties");
+    columns that are not needed, such as the frequency map, are not fetched.
+    """
+
+    def __init__(self, fields=None):
+        fields = set(fields or TOP_LEVEL_FIELDS)
+        unknown = fields.difference(TOP_LEVEL_FIELDS, PROPERTY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if "properties" in fields:
+            self.properties = list(PROPERTY_FIELDS)
+        else:
+            self.properties = [name for name in PROPERTY_FIELDS if name in fields]
+        self.top_level = [
+            name for name in TOP_LEVEL_FIELDS
+            if name in fields or (name == "properties" and self.properties)
+        ]
+
+        columns = {"id", "created_at"}  # always needed for keyset pagination
+        if "value" in self.top_level:
+            columns.add("value")
+        columns.update(name for name in self.properties if name not in ("sha256_hash", "character_frequency_map"))
+        if "character_frequency_map" in self.properties:
+            columns.update(("character_frequency_json", "character_frequency_blob"))
+        self.columns = sorted(columns)
+
+    @classmethod
+    def from_param(cls, raw):
+        """Build from a comma-separated `fields` query param (None/empty: all fields)."""
+        fields = [name.strip() for name in (raw or "").split(",") if name.strip()]
+        return cls(fields or None)
+
+    def rows(self, queryset):
+        return queryset.values(*self.columns)
+
+    def serialize(self, rows):
+        return list(self.iter_serialize(rows))
+
+    def iter_serialize(self, rows):
+        return map(self.item_builder(), rows)
+
+    def item_builder(self):
+        """A row -> response dict function; every field is resolved once, not per row."""
+        getters = [(name, self.getter(name)) for name in self.top_level]
+        return lambda row: {name: get(row) for name, get in getters}
+
+    def getter(self, name):
+        if name == "created_at":
+            format_created_at = datetime_formatter()
+            return lambda row: format_created_at(row["created_at"])
+        if name == "properties":
+            getters = [(prop, self.getter(prop)) for prop in self.properties]
+            return lambda row: {prop: get(row) for prop, get in getters}
+        if name == "sha256_hash":
+            return itemgetter("id")
+        if name == "character_frequency_map":
+            return frequency_map_of
+        return itemgetter(name)
+
+
+def frequency_map_of(row):
+    """The frequency map of a `.values()` row, from whichever column holds it."""
+    if row["character_frequency_json"] is not None:
+        return row["character_frequency_json"]
+    return decode_frequency_map(row["character_frequency_blob"])
+
+
+def datetime_formatter():
+    """
+    Formatter equivalent to the created_at field (CREATED_AT_FORMAT in the
+    current time zone), resolved once instead of per row.
+    """
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def format_datetime(value):
+        if tz is not None and value.tzinfo is not None:
+            value = value.astimezone(tz)
+        return value.isoformat()[:19] + "Z"  # same text as strftime(CREATED_AT_FORMAT)
+
+    return format_datetime
+
+
 class CreateAnalyzeSerializer(serializers.Serializer):
     """
     Input serializer for POST /strings.
@@ -0,0 +1,150 @@
+"""
+Hash-partitioned storage for AnalyzedString.
+
+With ANALYZER_SHARDS set to a list of database aliases, every string lives
+in the shard picked by the leading hex digits of its sha256 id (ids are
+uniformly distributed, so shards fill evenly). Its index rows
+(CharacterOccurrence, Trigram, SimilarityBand) live next to it, and each
+shard keeps the StatBucket counters of its own strings.
+
+  - ShardRouter sends reads and writes of one known row to its shard.
+  - AnalyzedStringManager.for_id()/get_many() pick the shard(s) for lookups
+    by id, and bulk_analyze() inserts each shard's rows in its own
+    transaction.
+  - fan_out() runs a query on every shard (in parallel threads) for
+    listings, counts and statistics; merge() combines the per-shard
+    results, already sorted on the ordering key, with a heap merge.
+
+With ANALYZER_SHARDS empty (the default) shards() is [None], i.e. "let the
+routers decide", and everything goes to the default database as before.
+The shard of a row depends on the number of shards, so changing it requires
+moving the existing rows.
+"""
+import contextvars
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+# Leading hex digits of the id used to pick a shard
+SHARD_KEY_DIGITS = 8
+
+# Models stored next to their string; StatBucket is per shard but written
+# with an explicit alias
+SHARDED_MODELS = {
+    "analyzer.AnalyzedString", "analyzer.CharacterOccurrence", "analyzer.Trigram", "analyzer.SimilarityBand",
+}
+
+_pool = None
+
+
+def shards():
+    """Database aliases holding strings; [None] (the routed default) when not sharded."""
+    return list(getattr(settings, "ANALYZER_SHARDS", ())) or [None]
+
+
+def enabled():
+    return len(shards()) > 1
+
+
+def shard_for(pk):
+    """The alias holding the string with primary key `pk`, or None when not sharded."""
+    aliases = getattr(settings, "ANALYZER_SHARDS", ())
+    if not aliases:
+        return None
+    return aliases[int(pk[:SHARD_KEY_DIGITS], 16) % len(aliases)]
+
+
+def group_by_shard(ids):
+    """{alias: [ids]} for the given primary keys."""
+    groups = {}
+    for pk in ids:
+        groups.setdefault(shard_for(pk), []).append(pk)
+    return groups
+
+
+def _in_transaction(aliases):
+    # Work inside an open transaction must see its uncommitted rows, which
+    # only this thread's connections can
+    return any(alias is not None and connections[alias].in_atomic_block for alias in aliases)
+
+
+def _run(fn, alias):
+    try:
+        return fn(alias)
+    finally:
+        close_old_connections()  # pool threads are outside the request cycle
+
+
+def fan_out(fn):
+    """
+    [fn(alias) for alias in shards()], run in parallel threads when there
+    is more than one shard.
+    """
+    global _pool
+    aliases = shards()
+    if len(aliases) == 1 or _in_transaction(aliases):
+        return [fn(alias) for alias in aliases]
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=len(aliases), thread_name_prefix="analyzer-shard")
+    # Run each task in its own copy of the caller's context so ContextVars
+    # (replicas.pinned_to_primary) hold on the pool threads too
+    futures = [_pool.submit(contextvars.copy_context().run, _run, fn, alias) for alias in aliases]
+    return [future.result() for future in futures]
+
+
+def merge(results, key, limit=None):
+    """
+    Merge per-shard lists (or iterators) each sorted by `key` into one
+    sorted sequence, keeping the first `limit` items. Returns an iterator.
+    """
+    if len(results) == 1:
+        merged = iter(results[0])
+    else:
+        merged = heapq.merge(*results, key=key)
+    return merged if limit is None else islice(merged, limit)
+
+
+async def amerge(iterators, key):
+    """merge() for async iterators (e.g. QuerySet.aiterator() per shard)."""
+    done = object()
+    heap = []
+    for index, iterator in enumerate(iterators):
+        item = await anext(iterator, done)
+        if item is not done:
+            heap.append((key(item), index, item))
+    heapq.heapify(heap)
+    while heap:
+        _, index, item = heap[0]
+        yield item
+        following = await anext(iterators[index], done)
+        if following is done:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (key(following), index, following))
+
+
+class ShardRouter:
+    """
+    Routes AnalyzedString rows and their index rows to the shard of their
+    string when the instance is known (saves, deletes, related lookups).
+    Queries without an instance are routed by the callers, which pass the
+    shard to .using() (see the module docstring).
+    """
+
+    def _shard(self, model, **hints):
+        instance = hints.get("instance")
+        if (instance is None or model._meta.label not in SHARDED_MODELS
+                or not getattr(settings, "ANALYZER_SHARDS", ())):
+            return None
+        # The string itself, or a row (or related manager) hanging off it
+        if instance._meta.label == "analyzer.AnalyzedString":
+            string_id = instance.pk
+        else:
+            string_id = getattr(instance, "string_id", None)
+        return shard_for(string_id) if string_id else None
+
+    db_for_read = _shard
+    db_for_write = _shard
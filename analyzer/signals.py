@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent after new AnalyzedString rows are inserted, including batch inserts
+# that bypass post_save. Receivers get `instances`, the list of new rows, and
+# `using`, the database alias they were written to. It is sent inside the
+# inserting transaction.
+strings_created = Signal()
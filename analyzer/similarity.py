@@ -0,0 +1,42 @@
+"""
+Near-duplicate lookup (GET /strings/<value>/similar).
+
+The query string's MinHash band buckets (see analyzer.minhash) are looked
+up in the SimilarityBand index; strings sharing at least one bucket are the
+candidates, and only they are compared with the query, on the exact
+Jaccard similarity of their shingles. The cost depends on the number of
+candidates, not on the size of the table.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from . import minhash, sharding
+from .models import AnalyzedString, SimilarityBand
+
+
+def similar_strings(value, threshold=0.8, limit=50, exclude_id=None):
+    """
+    [(similarity, obj)] for stored strings at least `threshold` similar to
+    `value`, most similar first, at most `limit` of them.
+    """
+    query_shingles = minhash.shingles(value)
+    buckets = minhash.band_buckets(minhash.signature(query_shingles))
+    in_any_bucket = reduce(or_, (Q(band=band, bucket=bucket) for band, bucket in buckets))
+
+    def shard_matches(alias):
+        candidate_ids = SimilarityBand.objects.using(alias).filter(in_any_bucket).values("string_id")
+        candidates = AnalyzedString.objects.using(alias).filter(id__in=candidate_ids)
+        if exclude_id is not None:
+            candidates = candidates.exclude(id=exclude_id)
+        matches = []
+        for obj in candidates:
+            similarity = minhash.jaccard(query_shingles, minhash.shingles(obj.value))
+            if similarity >= threshold:
+                matches.append((similarity, obj))
+        return matches
+
+    matches = [match for shard in sharding.fan_out(shard_matches) for match in shard]
+    matches.sort(key=lambda match: (-match[0], match[1].id))
+    return matches[:limit]
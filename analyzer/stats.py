@@ -0,0 +1,131 @@
+"""
+Incrementally maintained aggregate statistics (GET /strings/stats).
+
+Every create (`strings_created`) and delete (`post_delete`) turns the
+affected strings into per-bucket deltas and applies them inside the same
+transaction with two statements per DELTA_CHUNK_SIZE buckets: one INSERT
+... IGNORE for buckets seen for the first time and one UPDATE adding each
+bucket's delta through a CASE expression. `summary()` then reads the
+StatBucket table only. `rebuild()` (manage.py rebuild_stats) recomputes
+everything from the strings. With sharded storage every shard counts its
+own strings and `summary()` adds the shards up.
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import router, transaction
+from django.db.models import BigIntegerField, Case, Count, F, Q, Sum, Value, When
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import sharding
+from .models import AnalyzedString, CharacterOccurrence, StatBucket
+from .signals import strings_created
+
+# Bucket kinds; keys are 0 for the totals
+STRINGS = "strings"
+TOTAL_LENGTH = "total_length"
+PALINDROME = "palindrome"  # key 1 = palindromes, 0 = not
+LENGTH = "length"
+WORD_COUNT = "word_count"
+CHARACTER = "character"  # key = code point, count = occurrences
+
+# Buckets per UPDATE: every bucket adds a term to its WHERE and CASE, and
+# SQLite rejects expressions nested more than 1000 deep
+DELTA_CHUNK_SIZE = 200
+
+
+def deltas_for(instances, sign=1):
+    """Counter of (kind, key) -> change caused by adding (or removing, sign=-1) `instances`."""
+    deltas = Counter()
+    for obj in instances:
+        deltas[STRINGS, 0] += sign
+        deltas[TOTAL_LENGTH, 0] += sign * obj.length
+        deltas[PALINDROME, int(obj.is_palindrome)] += sign
+        deltas[LENGTH, obj.length] += sign
+        deltas[WORD_COUNT, obj.word_count] += sign
+        for ch, count in obj.character_frequency_map.items():
+            deltas[CHARACTER, ord(ch)] += sign * count
+    return deltas
+
+
+def apply_deltas(deltas, using):
+    deltas = [(bucket, delta) for bucket, delta in deltas.items() if delta]
+    buckets = StatBucket.objects.using(using)
+    for start in range(0, len(deltas), DELTA_CHUNK_SIZE):
+        chunk = deltas[start:start + DELTA_CHUNK_SIZE]
+        buckets.bulk_create(
+            [StatBucket(kind=kind, key=key) for (kind, key), _ in chunk],
+            ignore_conflicts=True,
+        )
+        buckets.filter(reduce(or_, (Q(kind=kind, key=key) for (kind, key), _ in chunk))).update(
+            count=F("count") + Case(
+                *(When(kind=kind, key=key, then=Value(delta)) for (kind, key), delta in chunk),
+                default=Value(0),
+                output_field=BigIntegerField(),
+            )
+        )
+
+
+def summary():
+    """
+    The statistics as served by /strings/stats, read from StatBucket only
+    (summed over the shards when storage is sharded).
+    """
+    counts = {}
+    shard_buckets = sharding.fan_out(
+        lambda alias: list(StatBucket.objects.using(alias).filter(count__gt=0).values_list("kind", "key", "count"))
+    )
+    for buckets in shard_buckets:
+        for kind, key, count in buckets:
+            kind_counts = counts.setdefault(kind, {})
+            kind_counts[key] = kind_counts.get(key, 0) + count
+
+    total = counts.get(STRINGS, {}).get(0, 0)
+    total_length = counts.get(TOTAL_LENGTH, {}).get(0, 0)
+    characters = counts.get(CHARACTER, {})
+    return {
+        "total_strings": total,
+        "palindromes": counts.get(PALINDROME, {}).get(1, 0),
+        "non_palindromes": counts.get(PALINDROME, {}).get(0, 0),
+        "average_length": round(total_length / total, 2) if total else None,
+        "length_histogram": {str(k): v for k, v in sorted(counts.get(LENGTH, {}).items())},
+        "word_count_distribution": {str(k): v for k, v in sorted(counts.get(WORD_COUNT, {}).items())},
+        "character_frequency": {
+            chr(cp): n for cp, n in sorted(characters.items(), key=lambda item: (-item[1], item[0]))
+        },
+    }
+
+
+def rebuild(using=None):
+    """Recompute every bucket from the strings (and the character index)."""
+    using = using or router.db_for_write(StatBucket)
+    strings = AnalyzedString.objects.using(using)
+    totals = strings.aggregate(n=Count("id"), length=Sum("length"))
+
+    buckets = [
+        StatBucket(kind=STRINGS, key=0, count=totals["n"]),
+        StatBucket(kind=TOTAL_LENGTH, key=0, count=totals["length"] or 0),
+    ]
+    for kind, field in ((PALINDROME, "is_palindrome"), (LENGTH, "length"), (WORD_COUNT, "word_count")):
+        for key, n in strings.values_list(field).annotate(n=Count("id")).order_by():
+            buckets.append(StatBucket(kind=kind, key=int(key), count=n))
+    occurrences = CharacterOccurrence.objects.using(using).values_list("code_point").annotate(n=Sum("count"))
+    for code_point, n in occurrences.order_by():
+        buckets.append(StatBucket(kind=CHARACTER, key=code_point, count=n))
+
+    with transaction.atomic(using=using):
+        StatBucket.objects.using(using).all().delete()
+        StatBucket.objects.using(using).bulk_create(buckets, batch_size=2000)
+    return len(buckets)
+
+
+@receiver(strings_created)
+def count_created(sender, instances, using, **kwargs):
+    apply_deltas(deltas_for(instances), using)
+
+
+@receiver(post_delete, sender=AnalyzedString)
+def count_deleted(sender, instance, using, **kwargs):
+    apply_deltas(deltas_for([instance], sign=-1), using)
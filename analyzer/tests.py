@@ -1,7 +1,34 @@
+import json
+import os
+import tempfile
+from contextlib import ExitStack
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.http import HttpResponse, QueryDict
+from django.db import DatabaseError, IntegrityError, connection, router
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import AnalyzedString, compute_sha256
+from .models import (
+    AnalyzedString, CharacterOccurrence, SimilarityBand, StatBucket, Trigram, compute_char_mask, compute_sha256,
+    decode_frequency_map, encode_frequency_map,
+)
+from . import cache as response_cache
+from . import engine, executor, indexing, ingest, minhash, replicas, sharding, stats
+from . import lookup
+from .filters import compile_plan
+from rest_framework.renderers import JSONRenderer
+from .serializers import AnalyzedStringSerializer, StringRowSerializer
+from .natlang import _parse_normalized, parse_natural_language_query
 
 
 class AnalyzedStringTests(APITestCase):
@@ -11,6 +38,8 @@ class AnalyzedStringTests(APITestCase):
         self.string_1 = "madam"
         self.string_2 = "hello world"
         self.hash_1 = compute_sha256(self.string_1)
+        response_cache.get_cache().clear()
+        lookup.resolutions.clear()
 
         self.obj_1 = AnalyzedString.objects.create(value=self.string_1)
         self.obj_2 = AnalyzedString.objects.create(value=self.string_2)
@@ -40,6 +69,110 @@ class AnalyzedStringTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
         self.assertIn("String already exists", response.data["detail"])
 
+    def test_create_is_one_insert_or_ignore(self):
+        for value, expected in ((self.string_1, status.HTTP_409_CONFLICT), ("level", status.HTTP_201_CREATED)):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.base_url, {"value": value}, format="json")
+            self.assertEqual(response.status_code, expected)
+            string_queries = [q["sql"] for q in queries if "analyzer_analyzedstring" in q["sql"]]
+            self.assertEqual(len(string_queries), 1)
+            self.assertTrue(string_queries[0].startswith("INSERT"))
+        self.assertTrue(AnalyzedString.objects.get(value="level").is_palindrome)
+        self.assertTrue(CharacterOccurrence.objects.filter(string__value="level").exists())
+        self.assertFalse(AnalyzedString(value=self.string_2).insert())
+
+    @skipUnless(connection.vendor == "mysql", "INSERT IGNORE warnings are MySQL-specific")
+    def test_insert_raises_on_mysql_warnings_other_than_duplicates(self):
+        analyze = AnalyzedString.analyze
+
+        def out_of_range(obj, properties=None):
+            analyze(obj, properties)
+            obj.length = 2 ** 40
+
+        with patch.object(AnalyzedString, "analyze", out_of_range):
+            with self.assertRaises(DatabaseError):
+                AnalyzedString(value="too long").insert()
+        self.assertFalse(AnalyzedString.objects.filter(value="too long").exists())
+
+    def test_idempotency_key_returns_existing_string(self):
+        headers = {"Idempotency-Key": "retry-1"}
+        response = self.client.post(self.base_url, {"value": "kayak"}, format="json", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        retry = self.client.post(self.base_url, {"value": "kayak"}, format="json", headers=headers)
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data, response.data)
+
+        response = self.client.post(self.base_url, {"value": self.string_1}, format="json",
+                                    headers={"Idempotency-Key": "retry-2"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.hash_1)
+        response = self.client.post(self.base_url, {"value": "other"}, format="json", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertFalse(AnalyzedString.objects.filter(value="other").exists())
+
+    def test_async_ingest_queues_then_worker_stores(self):
+        queue_dir = self.enterContext(tempfile.TemporaryDirectory())
+        with override_settings(ANALYZER_ASYNC_INGEST=True,
+                               ANALYZER_INGEST_QUEUE_PATH=os.path.join(queue_dir, "queue.sqlite3")):
+            for _ in range(2):  # a repeated value is queued once
+                response = self.client.post(self.base_url, {"value": "queued racecar"}, format="json")
+                self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            pk = response.data["id"]
+            self.assertEqual(pk, compute_sha256("queued racecar"))
+            self.client.post(self.base_url, {"value": self.string_1}, format="json")
+            self.assertFalse(AnalyzedString.objects.filter(id=pk).exists())
+
+            response = self.client.get(reverse("pending_strings"))
+            self.assertEqual(response.data["count"], 2)
+            self.assertEqual([item["id"] for item in response.data["results"]], [pk, self.hash_1])
+            response = self.client.get(reverse("pending_string", args=[pk]))
+            self.assertEqual(response.data["status"], "pending")
+
+            out = StringIO()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("ingest_worker", "--once", stdout=out)
+            self.assertIn("1 created, 1 duplicate", out.getvalue())
+            self.assertEqual(AnalyzedString.objects.get(id=pk).word_count, 2)
+            self.assertEqual(self.client.get(reverse("pending_strings")).data["count"], 0)
+            response = self.client.get(reverse("pending_string", args=[pk]))
+            self.assertEqual(response.data["status"], "stored")
+            response = self.client.get(reverse("pending_string", args=["not-an-id"]))
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_ingest_worker_invalidates_cached_lists(self):
+        queue_dir = self.enterContext(tempfile.TemporaryDirectory())
+        with override_settings(ANALYZER_ASYNC_INGEST=True,
+                               ANALYZER_INGEST_QUEUE_PATH=os.path.join(queue_dir, "queue.sqlite3")):
+            self.client.post(self.base_url, {"value": "drained later"}, format="json")
+            self.assertEqual(self.client.get(self.base_url).data["count"], 2)
+            self.assertEqual(self.client.get(self.base_url)["X-Cache"], "HIT")
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("ingest_worker", "--once", stdout=StringIO())
+            response = self.client.get(self.base_url)
+            self.assertEqual(response["X-Cache"], "MISS")
+            self.assertEqual(response.data["count"], 3)
+
+    def test_async_ingest_requires_a_shared_cache(self):
+        with override_settings(ANALYZER_ASYNC_INGEST=True):
+            self.assertIsInstance(response_cache.get_cache(), LocMemCache)
+            self.assertEqual([error.id for error in ingest.check_shared_cache(None)], ["analyzer.E001"])
+            with self.assertRaises(SystemCheckError):
+                call_command("check")
+            with override_settings(ANALYZER_CACHE_ENABLED=False):
+                self.assertEqual(ingest.check_shared_cache(None), [])
+        self.assertEqual(ingest.check_shared_cache(None), [])
+
+    def test_pending_is_404_without_async_ingest(self):
+        with tempfile.TemporaryDirectory() as queue_dir:
+            queue_path = os.path.join(queue_dir, "queue.sqlite3")
+            with override_settings(ANALYZER_INGEST_QUEUE_PATH=queue_path):
+                self.assertEqual(reverse("pending_strings"), "/ingest/pending")
+                response = self.client.get(reverse("pending_strings"))
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                response = self.client.get(reverse("pending_string", args=[self.hash_1]))
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertFalse(os.path.exists(queue_path))
+
     def test_create_invalid_string_type(self):
         """Reject non-string inputs."""
         data = {"value": 12345}
@@ -68,6 +201,31 @@ class AnalyzedStringTests(APITestCase):
         for item in results:
             self.assertTrue(item["properties"]["is_palindrome"])
 
+    def test_list_keyset_pagination(self):
+        """Pages follow (created_at, id) order and the cursor resumes after the last row."""
+        AnalyzedString.objects.create(value="third")
+        response = self.client.get(self.base_url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+        second = self.client.get(response.data["next"])
+        self.assertEqual([item["value"] for item in second.data["results"]], ["third"])
+        self.assertIsNone(second.data["next"])
+
+    def test_list_invalid_cursor(self):
+        """A malformed cursor is rejected."""
+        response = self.client.get(self.base_url, {"cursor": "%%%"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_stream_ndjson(self):
+        """stream=true returns every matching row as NDJSON."""
+        response = self.client.get(self.base_url, {"stream": "true", "is_palindrome": "true"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["value"] for line in lines], [self.string_1])
+
     # ---------- GET /strings/<string_value> ----------
     def test_get_string_by_value(self):
         """Retrieve analyzed string using its value."""
@@ -89,6 +247,21 @@ class AnalyzedStringTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_string_single_query(self):
+        """Value and hash lookups each cost one query, including misses."""
+        for key in (self.string_1, self.hash_1, "notfound", "0" * 64):
+            with self.assertNumQueries(1):
+                self.client.get(reverse("detail_string", args=[key]))
+
+    def test_get_string_whose_value_is_a_hash(self):
+        """A stored value that looks like a hash wins over the hash match."""
+        hex_value = self.hash_1
+        self.client.get(reverse("detail_string", args=[hex_value]))  # caches the hash match
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = AnalyzedString.objects.create(value=hex_value)
+        response = self.client.get(reverse("detail_string", args=[hex_value]))
+        self.assertEqual(response.data["id"], obj.id)
+
     # ---------- DELETE /strings/<string_value> ----------
     def test_delete_existing_string(self):
         """Delete an existing string."""
@@ -96,6 +269,7 @@ class AnalyzedStringTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(AnalyzedString.objects.filter(value=self.string_2).exists())
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
 
     def test_delete_nonexistent_string(self):
         """Try deleting a non-existing string."""
@@ -103,6 +277,41 @@ class AnalyzedStringTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    # ---------- Response cache ----------
+    def test_detail_cached_until_delete(self):
+        """A cached detail is served without queries and dropped on delete."""
+        url = reverse("detail_string", args=[self.string_2])
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["value"], self.string_2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_cache_invalidated_on_create(self):
+        """Creating a string makes cached lists stale."""
+        self.assertEqual(self.client.get(self.base_url).data["count"], 2)
+        self.assertEqual(self.client.get(self.base_url)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.base_url, {"value": "fresh"}, format="json")
+        response = self.client.get(self.base_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 3)
+
+        stats = self.client.get(reverse("cache_stats")).data
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_cache_stats_route_does_not_shadow_a_string(self):
+        """The string "cache-stats" is reachable at its detail URL."""
+        self.assertEqual(reverse("cache_stats"), "/cache-stats")
+        self.client.post(self.base_url, {"value": "cache-stats"}, format="json")
+        response = self.client.get(reverse("detail_string", args=["cache-stats"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["value"], "cache-stats")
+
     # ---------- Natural Language Filter ----------
     def test_natural_language_query(self):
         """Test natural language query endpoint."""
@@ -117,3 +326,615 @@ class AnalyzedStringTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("query parameter required", response.data["detail"])
+
+    # ---------- Batch POST /strings ----------
+    def test_batch_create_mixed_results(self):
+        """A JSON list creates new strings and reports duplicates/invalid items."""
+        data = ["level", {"value": "new string"}, self.string_1, "level", "   ", 42]
+        response = self.client.post(self.base_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [item["status"] for item in response.data["results"]]
+        self.assertEqual(statuses, ["created", "created", "duplicate", "duplicate", "invalid", "invalid"])
+        self.assertEqual(response.data["created"], 2)
+        obj = AnalyzedString.objects.get(id=compute_sha256("level"))
+        self.assertTrue(obj.is_palindrome)
+        self.assertEqual(obj.character_frequency_map, {"l": 2, "e": 2, "v": 1})
+
+    def test_batch_create_skips_rows_inserted_concurrently(self):
+        """A row stored by another request after the existence check is a duplicate, counted once."""
+        analyze_batch = executor.analyze_batch
+
+        def racing_analyze_batch(texts):
+            AnalyzedString.objects.create(value="raced")  # the other request wins
+            return analyze_batch(texts)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with patch.object(executor, "analyze_batch", racing_analyze_batch):
+                outcomes = AnalyzedString.objects.bulk_analyze(["raced", "calm"])
+        self.assertEqual([outcome for outcome, _ in outcomes], ["duplicate", "created"])
+        self.assertEqual(stats.summary()["total_strings"], 4)
+        self.assertEqual(CharacterOccurrence.objects.filter(string__value="raced").count(), 5)
+
+    def test_batch_create_ndjson(self):
+        """An NDJSON body is accepted as a batch."""
+        body = '"first"\n\n{"value": "second"}\n'
+        response = self.client.post(self.base_url, body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 2)
+        self.assertTrue(AnalyzedString.objects.filter(value="second").exists())
+
+    # ---------- import_strings command ----------
+    def test_import_strings_command(self):
+        """Imported rows match API-created rows and checkpoints allow resuming."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "input.ndjson")
+            with open(path, "w") as fh:
+                fh.write('"noon"\n{"value": "two words"}\nnot json\n"madam"\n')
+            checkpoint = path + ".checkpoint"
+            with open(checkpoint, "w") as fh:
+                json.dump({"path": os.path.abspath(path), "records": 1}, fh)
+
+            call_command("import_strings", path, "--resume", "--chunk-size", "2", stdout=StringIO())
+
+            self.assertFalse(os.path.exists(checkpoint))
+        self.assertFalse(AnalyzedString.objects.filter(value="noon").exists())
+        obj = AnalyzedString.objects.get(value="two words")
+        self.assertEqual(obj.id, compute_sha256("two words"))
+        self.assertEqual(obj.word_count, 2)
+
+    # ---------- Character index ----------
+    def test_character_index_maintained(self):
+        """Index rows are written on create and removed with the string."""
+        occurrences = CharacterOccurrence.objects.filter(string=self.obj_2)
+        self.assertEqual(occurrences.get(code_point=ord("l")).count, 3)
+        self.assertEqual(occurrences.count(), len(self.obj_2.character_frequency_map))
+        self.obj_2.delete()
+        self.assertFalse(CharacterOccurrence.objects.filter(string_id=self.obj_2.id).exists())
+
+    def test_filter_contains_character_and_min_count(self):
+        """contains_character and min_char_count are served by the index."""
+        response = self.client.get(self.base_url, {"contains_character": "w"})
+        self.assertEqual([item["value"] for item in response.data["results"]], [self.string_2])
+
+        response = self.client.get(self.base_url, {"min_char_count": "l:3"})
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(self.base_url, {"min_char_count": "l:4"})
+        self.assertEqual(response.data["count"], 0)
+
+        response = self.client.get(self.base_url, {"min_char_count": "ll"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ---------- Multi-character filters ----------
+    def test_char_mask_computed(self):
+        """char_mask has one bit per distinct tracked character."""
+        obj = AnalyzedString.objects.create(value="Abc é")
+        mask, _ = compute_char_mask("abc ")
+        self.assertEqual(obj.char_mask, mask)
+        self.assertEqual(compute_char_mask("é")[1], {"é"})
+
+    def test_filter_contains_all_and_any(self):
+        """contains_all / contains_any combine bitmask and index lookups."""
+        AnalyzedString.objects.create(value="café madam")
+        values = lambda params: sorted(i["value"] for i in self.client.get(self.base_url, params).data["results"])
+        self.assertEqual(values({"contains_all": "dm"}), ["café madam", "madam"])
+        self.assertEqual(values({"contains_all": "mé"}), ["café madam"])
+        self.assertEqual(values({"contains_any": "wé"}), ["café madam", "hello world"])
+        self.assertEqual(values({"contains_any": "xyz"}), [])
+
+    def test_filter_char_count(self):
+        """char_count[c]__op treats a missing character as a count of zero."""
+        values = lambda params: sorted(i["value"] for i in self.client.get(self.base_url, params).data["results"])
+        self.assertEqual(values({"char_count[l]__gte": 3}), ["hello world"])
+        self.assertEqual(values({"char_count[l]__lt": 1}), ["madam"])
+        self.assertEqual(values({"char_count[m]": 2}), ["madam"])
+        response = self.client.get(self.base_url, {"char_count[l]__gte": "many"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_natural_language_multi_character(self):
+        """Natural-language phrases for several letters and letter counts."""
+        url = reverse("natlang_filter")
+        response = self.client.get(url, {"query": "strings containing the letters h, w and d"})
+        self.assertEqual(response.data["interpreted_query"]["parsed_filters"], {"contains_all": "hwd"})
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(url, {"query": "strings with the letter l at least 3 times"})
+        self.assertEqual(response.data["interpreted_query"]["parsed_filters"], {"char_count[l]__gte": 3})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_natural_language_parser_phrases(self):
+        """Richer phrasings map to the expected filters."""
+        cases = {
+            "strings longer than 10 characters": {"min_length": 11},
+            "between 5 and 10 characters": {"min_length": 5, "max_length": 10},
+            "exactly 3 words that are not palindromes": {"word_count": 3, "is_palindrome": False},
+            "palindromes shorter than 8 characters": {"is_palindrome": True, "max_length": 7},
+            "at most 5 characters": {"max_length": 5},
+            "strings of exactly 4 characters": {"min_length": 4, "max_length": 4},
+            "palindromes longer than 4": {"is_palindrome": True, "min_length": 5},
+            "strings longer than 3 that are palindromes": {"min_length": 4, "is_palindrome": True},
+            "containing the letters a and b at least 3 times": {
+                "contains_all": "ab", "char_count[a]__gte": 3, "char_count[b]__gte": 3,
+            },
+        }
+        for query, expected in cases.items():
+            self.assertEqual(parse_natural_language_query(query), expected, query)
+
+        # Word-count bounds cannot be expressed and are never read as lengths
+        for query in ("between 2 and 4 words", "at least 3 words", "fewer than 3 words",
+                      "longer than or equal to 2 words", "palindromes at most 2 words",
+                      "containing any of the letters x or y at least 2 times"):
+            with self.assertRaises(ValueError, msg=query):
+                parse_natural_language_query(query)
+        response = self.client.get(reverse("natlang_filter"), {"query": "at least 3 words"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_natural_language_parser_memoized(self):
+        """Equivalent phrasings share one cached parse and results are copies."""
+        parse_natural_language_query("Show   PALINDROMES")
+        info = _parse_normalized.cache_info()
+        parsed = parse_natural_language_query("show palindromes")
+        self.assertEqual(_parse_normalized.cache_info().hits, info.hits + 1)
+        parsed["word_count"] = 2
+        self.assertEqual(parse_natural_language_query("show palindromes"), {"is_palindrome": True})
+
+    # ---------- Shared filter plan ----------
+    def test_equivalent_filters_compile_to_same_plan(self):
+        """Different spellings of the same filters give equal plans."""
+        self.assertEqual(
+            compile_plan(QueryDict("contains_character=e&min_char_count=l:3")),
+            compile_plan({"contains_all": "e", "char_count[l]__gte": 3}),
+        )
+        self.assertNotEqual(compile_plan({"contains_all": "e"}), compile_plan({"contains_any": "e"}))
+
+    def test_plan_drives_by_rarest_character(self):
+        """Without an indexed predicate the rarest required character drives the query."""
+        self.assertEqual(compile_plan({"contains_all": "etq"}).driving_character(), "q")
+        self.assertIsNone(compile_plan({"contains_all": "etq", "min_length": 3}).driving_character())
+        response = self.client.get(self.base_url, {"contains_all": "wd"})
+        self.assertEqual([item["value"] for item in response.data["results"]], [self.string_2])
+
+    def test_natural_language_shares_list_pipeline(self):
+        """Natural-language results are paginated and share cached pages with /strings/."""
+        self.client.get(self.base_url, {"is_palindrome": "true", "limit": 1})
+        url = reverse("natlang_filter")
+        response = self.client.get(url, {"query": "show palindromes", "limit": 1})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual([item["value"] for item in response.data["data"]], [self.string_1])
+        self.assertIn("next", response.data)
+
+    # ---------- Substring search ----------
+    def test_substring_filters_use_trigram_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyzedString.objects.bulk_analyze(["Prefix matters", "the suffix", "HELLO there", "x" * 2000 + "llo"])
+        self.assertTrue(Trigram.objects.filter(string_id=self.obj_2.id, gram="llo").exists())
+        long_grams = Trigram.objects.filter(string__length__gt=2000).values_list("gram", flat=True)
+        self.assertEqual(list(long_grams), [""])  # too long to index
+
+        def values(params):
+            response = self.client.get(self.base_url, params)
+            return sorted(item["value"][:20] for item in response.data["results"])
+        self.assertEqual(values({"contains": "LLO"}), ["HELLO there", "hello world", "x" * 20])
+        self.assertEqual(values({"startswith": "pre"}), ["Prefix matters"])
+        self.assertEqual(values({"endswith": "fix"}), ["the suffix"])
+        self.assertEqual(values({"endswith": "x"}), ["the suffix"])  # no trigram: plain LIKE
+        self.assertEqual(values({"contains": "lo w", "word_count": 2}), ["hello world"])
+
+        parsed = parse_natural_language_query("strings containing the word there")
+        self.assertEqual(parsed, {"contains": "there"})
+        self.assertEqual(parse_natural_language_query("palindromes starting with 'ma'"),
+                         {"is_palindrome": True, "startswith": "ma"})
+        response = self.client.get(reverse("natlang_filter"), {"query": "strings ending with world"})
+        self.assertEqual([item["value"] for item in response.data["data"]], [self.string_2])
+
+    def test_similar_strings_found_through_lsh_bands(self):
+        variants = ["HELLO   World", "hello wrld", "hello world!", "say hello world"]
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyzedString.objects.bulk_analyze(variants + ["goodbye moon", "x" * 5000])
+        self.assertEqual(SimilarityBand.objects.filter(string_id=self.obj_2.id).count(), minhash.LSH_BANDS)
+        # Indexing a string twice (concurrent inserts) adds no rows
+        indexing.index_similarity_bands(sender=AnalyzedString, instances=[self.obj_2], using="default")
+        self.assertEqual(SimilarityBand.objects.filter(string_id=self.obj_2.id).count(), minhash.LSH_BANDS)
+        self.assertFalse(SimilarityBand.objects.filter(string__length=5000).exists())  # too long to index
+
+        url = reverse("similar_strings", args=["hello world"])
+        response = self.client.get(url, {"threshold": 0.5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["query"], "hello world")
+        found = {item["value"]: item["similarity"] for item in response.data["results"]}
+        self.assertEqual(set(found), set(variants))  # not the string itself, not "goodbye moon"
+        self.assertEqual(found["HELLO   World"], 1.0)
+        self.assertEqual(response.data["results"][0]["value"], "HELLO   World")
+
+        # By hash, a stricter threshold, and text that is not stored
+        response = self.client.get(reverse("similar_strings", args=[self.obj_2.id]), {"threshold": 0.95})
+        self.assertEqual([item["value"] for item in response.data["results"]], ["HELLO   World"])
+        response = self.client.get(reverse("similar_strings", args=["Hello World."]), {"threshold": 0.8})
+        self.assertIn("hello world", {item["value"] for item in response.data["results"]})
+
+        for params in ({"threshold": "0"}, {"threshold": "abc"}, {"limit": "0"}):
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_anagrams_share_an_indexed_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyzedString.objects.bulk_analyze(["Listen", "silent!", "En list", "tinsel 1", "!!!"])
+        listen = AnalyzedString.objects.get(value="Listen")
+        self.assertEqual(listen.anagram_key, AnalyzedString.objects.get(value="En list").anagram_key)
+        self.assertEqual(AnalyzedString.objects.get(value="!!!").anagram_key, "")
+
+        response = self.client.get(reverse("anagrams", args=["Listen"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual({item["value"] for item in response.data["results"]}, {"silent!", "En list"})
+        response = self.client.get(reverse("anagrams", args=["INLETS"]))  # not stored
+        self.assertEqual(response.data["count"], 3)
+        response = self.client.get(reverse("anagrams", args=[listen.id]), {"limit": 1})
+        self.assertEqual([item["value"] for item in response.data["results"]], ["silent!"])
+        self.assertEqual(self.client.get(reverse("anagrams", args=["!!!"])).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.base_url, {"is_anagram_of": "tinsel", "word_count": 1})
+        self.assertEqual({item["value"] for item in response.data["results"]}, {"Listen", "silent!"})
+        self.assertEqual(response.data["filters_applied"]["is_anagram_of"], "tinsel")
+        self.assertEqual(compile_plan({"is_anagram_of": "Silent"}), compile_plan({"is_anagram_of": "listen"}))
+        self.assertEqual(self.client.get(self.base_url, {"is_anagram_of": "?"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(parse_natural_language_query("anagrams of 'madam'"), {"is_anagram_of": "madam"})
+
+    # ---------- Analysis engine ----------
+    def test_engine_matches_per_character_loop(self):
+        """engine.analyze gives the same properties (and key order) as the old loop."""
+        for text in ["Madam", "hello world", "ßİΣσς é😀 한글", "  a  "]:
+            lower = text.lower()
+            freq = {}
+            for ch in lower:
+                freq[ch] = freq.get(ch, 0) + 1
+            props = engine.analyze(text)
+            self.assertEqual(
+                props.as_tuple(),
+                (len(text), lower == lower[::-1], len(set(lower)), len(text.split()), freq),
+            )
+            self.assertEqual(list(props.character_frequency_map), list(freq))
+
+    def test_engine_batch_matches_single(self):
+        texts = ["racecar", "Hello World", "ΣΑΣ", "😀x😀"]
+        self.assertEqual(engine.analyze_batch(texts), [engine.analyze(t) for t in texts])
+
+    # ---------- Long strings ----------
+    def test_long_strings_analyzed_in_windows(self):
+        """Windowed/streamed analysis matches whole-text analysis, across chunk boundaries."""
+        text = "Lorem ipsum dolor sit amet " * 5000
+        self.assertEqual(engine.analyze(text), engine._analyze_whole(text))
+        self.assertTrue(engine.analyze(text + text[::-1]).is_palindrome)
+
+        analyzer = engine.StreamAnalyzer()
+        for chunk in ["hel", "lo wor", "ld ", " ΑΣ", "Σ"]:
+            analyzer.feed(chunk)
+        self.assertEqual(analyzer.result("hello world  ΑΣΣ"), engine._analyze_whole("hello world  ΑΣΣ"))
+
+    def test_long_values_with_shared_prefix_are_distinct(self):
+        prefix = "x" * 300
+        for suffix in ("a", "b"):
+            response = self.client.post(self.base_url, {"value": prefix + suffix}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data["properties"]["length"], 301)
+
+    @override_settings(ANALYZER_STREAM_THRESHOLD=1024)
+    def test_post_plain_text_body_streamed(self):
+        body = "GET /index.html 200\n" * 5000
+        response = self.client.post(self.base_url, data=body.encode(), content_type="text/plain")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["id"], compute_sha256(body))
+        self.assertEqual(response.data["properties"]["length"], len(body))
+        self.assertEqual(response.data["properties"]["word_count"], 15000)
+
+    # ---------- Compact frequency map ----------
+    def test_frequency_map_binary_round_trip(self):
+        freq = {"z": 1, "a": 300, "😀": 2, "é": 70000}
+        blob = encode_frequency_map(freq)
+        self.assertEqual(list(decode_frequency_map(blob).items()), list(freq.items()))
+        self.assertEqual(len(encode_frequency_map({"a": 1, "b": 2})), 2 + 2 * 2)
+
+    def test_compact_frequency_map_storage(self):
+        """Binary rows serialize exactly like JSON rows and convert both ways."""
+        expected = self.client.get(reverse("detail_string", args=[self.string_2])).data
+        self.obj_2.delete()
+        with override_settings(ANALYZER_COMPACT_FREQUENCY_MAP=True):
+            AnalyzedString.objects.create(value=self.string_2)
+        stored = AnalyzedString.objects.get(value=self.string_2)
+        self.assertIsNone(stored.character_frequency_json)
+        self.assertEqual(AnalyzedStringSerializer(stored).data["properties"], expected["properties"])
+
+        call_command("convert_frequency_maps", "--to", "json", stdout=StringIO())
+        stored = AnalyzedString.objects.get(value=self.string_2)
+        self.assertIsNone(stored.character_frequency_blob)
+        self.assertEqual(stored.character_frequency_map, expected["properties"]["character_frequency_map"])
+
+    # ---------- Lean list serialization ----------
+    def test_row_serializer_output_is_byte_identical(self):
+        with override_settings(ANALYZER_COMPACT_FREQUENCY_MAP=True):
+            AnalyzedString.objects.create(value="Packed Row ß😀")
+        queryset = AnalyzedString.objects.order_by("created_at", "id")
+        row_serializer = StringRowSerializer()
+        self.assertEqual(
+            JSONRenderer().render(row_serializer.serialize(row_serializer.rows(queryset))),
+            JSONRenderer().render(AnalyzedStringSerializer(queryset, many=True).data),
+        )
+
+    def test_list_fields_param(self):
+        response = self.client.get(self.base_url, {"fields": "value,word_count"})
+        self.assertEqual(response.data["results"][0], {"value": self.string_1, "properties": {"word_count": 1}})
+        self.assertNotIn("character_frequency_json", StringRowSerializer(["id", "length"]).columns)
+
+        response = self.client.get(self.base_url, {"fields": "value,bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ---------- Async views ----------
+    async def test_async_views_match_sync_views(self):
+        urls = [
+            (self.base_url, {"is_palindrome": "true"}),
+            (reverse("natlang_filter"), {"query": "single word palindromes"}),
+            (reverse("detail_string", args=[self.string_2]), {}),
+        ]
+        for url, params in urls:
+            await sync_to_async(response_cache.get_cache().clear)()
+            expected = await sync_to_async(self.client.get)(url, params)
+            await sync_to_async(response_cache.get_cache().clear)()
+            with override_settings(ROOT_URLCONF="analyzer.async_urls"):
+                response = await self.async_client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, expected.content)
+
+    async def test_async_invalid_cursor_is_404(self):
+        for url, params in ((self.base_url, {}), (reverse("natlang_filter"), {"query": "palindromes"})):
+            expected = await sync_to_async(self.client.get)(url, {**params, "cursor": "%%%"})
+            with override_settings(ROOT_URLCONF="analyzer.async_urls"):
+                response = await self.async_client.get(url, {**params, "cursor": "%%%"})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(response.content, expected.content)
+
+    @override_settings(ROOT_URLCONF="analyzer.async_urls", ANALYZER_INLINE_MAX_LENGTH=4)
+    async def test_async_create_and_delete(self):
+        response = await self.async_client.post(self.base_url, {"value": "async racecar"},
+                                                content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["properties"]["word_count"], 2)
+        response = await self.async_client.post(self.base_url, {"value": "async racecar"},
+                                                content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = await self.async_client.post(self.base_url, {"value": "async racecar"},
+                                                content_type="application/json", headers={"Idempotency-Key": "k"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = await self.async_client.post(self.base_url, {"value": 5}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        queue_dir = self.enterContext(tempfile.TemporaryDirectory())
+        with override_settings(ANALYZER_ASYNC_INGEST=True,
+                               ANALYZER_INGEST_QUEUE_PATH=os.path.join(queue_dir, "queue.sqlite3")):
+            response = await self.async_client.post(self.base_url, {"value": "async queued"},
+                                                    content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        url = reverse("detail_string", args=["async racecar"])
+        response = await self.async_client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # ---------- Analysis executor ----------
+    def test_engine_compact_round_trip(self):
+        props = engine.analyze("Hello, Wörld 😀")
+        self.assertEqual(engine.from_compact(engine.analyze_compact("Hello, Wörld 😀")), props)
+
+    @override_settings(ANALYZER_EXECUTOR="process", ANALYZER_ANALYSIS_WORKERS=2,
+                       ANALYZER_INLINE_MAX_LENGTH=8, ANALYZER_OFFLOAD_MIN_BATCH=3)
+    def test_process_executor_matches_inline(self):
+        texts = ["a long string to offload", "abc", "Racecar", "Σίσυφος"]
+        self.assertEqual(executor.analyze(texts[0]), engine.analyze(texts[0]))
+        self.assertEqual(executor.analyze_batch(texts), engine.analyze_batch(texts))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outcomes = AnalyzedString.objects.bulk_analyze(texts)
+        self.assertEqual([status for status, _ in outcomes], ["created"] * 4)
+        self.assertEqual(AnalyzedString.objects.get(value="Racecar").is_palindrome, True)
+
+    # ---------- Aggregate statistics ----------
+    def test_stats_maintained_on_create_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyzedString.objects.bulk_analyze(["level", "two words", "Aa"])
+            AnalyzedString.objects.get(value="two words").delete()
+
+        data = self.client.get(reverse("stats")).data
+        self.assertEqual(data["total_strings"], 4)
+        self.assertEqual((data["palindromes"], data["non_palindromes"]), (3, 1))
+        self.assertEqual(data["length_histogram"], {"2": 1, "5": 2, "11": 1})
+        self.assertEqual(data["word_count_distribution"], {"1": 3, "2": 1})
+        self.assertEqual(data["character_frequency"]["l"], 5)
+        self.assertEqual(data["average_length"], 5.75)
+
+        # A full rebuild gives the same numbers
+        call_command("rebuild_stats", stdout=StringIO())
+        self.assertEqual(stats.summary(), data)
+
+    def test_saving_an_existing_value_raises(self):
+        """A second save() of a value must not update the row or count it again."""
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyzedString(value="kayak").save()
+        stored = AnalyzedString.objects.get(value="kayak")
+        buckets = list(StatBucket.objects.order_by("kind", "key").values_list("kind", "key", "count"))
+
+        with self.assertRaises(IntegrityError):
+            AnalyzedString(value="kayak").save()
+        self.assertEqual(AnalyzedString.objects.get(value="kayak").created_at, stored.created_at)
+        self.assertEqual(list(StatBucket.objects.order_by("kind", "key").values_list("kind", "key", "count")),
+                         buckets)
+        self.assertEqual(self.client.get(reverse("stats")).data["length_histogram"]["5"], 2)
+
+    def test_stats_with_many_distinct_characters(self):
+        """One UPDATE per bucket chunk: SQLite limits expression depth to 1000."""
+        text = "".join(chr(cp) for cp in range(0x4E00, 0x4E00 + 1500))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.base_url, {"value": text}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = self.client.get(reverse("stats")).data
+        self.assertEqual(data["total_strings"], 3)
+        self.assertEqual(data["character_frequency"]["\u4e00"], 1)
+        self.assertEqual(len(data["character_frequency"]), 1500 + len(set("madamhello world")))
+
+    # ---------- Counts ----------
+    def test_exact_count_cached_per_plan(self):
+        self.client.get(self.base_url, {"is_palindrome": "true", "limit": 1})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.base_url, {"is_palindrome": "true", "limit": 2})
+        self.assertEqual(response.data["count"], 1)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries.captured_queries))
+
+    def test_approximate_count_from_stats(self):
+        response = self.client.get(self.base_url, {"is_palindrome": "true", "approximate": "true"})
+        self.assertEqual((response.data["count"], response.data["count_is_estimate"]), (1, True))
+        # Character filters cannot be estimated from the stats (nor on SQLite): exact count
+        response = self.client.get(self.base_url, {"contains_character": "w", "approximate": "true"})
+        self.assertEqual((response.data["count"], response.data["count_is_estimate"]), (1, False))
+        self.assertNotIn("count_is_estimate", self.client.get(self.base_url).data)
+
+    # ---------- Sharded storage ----------
+    @override_settings(ANALYZER_SHARDS=["shard_a", "shard_b", "shard_c"])
+    def test_shard_routing_by_hash_prefix(self):
+        ids = [compute_sha256(f"value {i}") for i in range(300)]
+        groups = sharding.group_by_shard(ids)
+        self.assertEqual(sorted(groups), ["shard_a", "shard_b", "shard_c"])
+        self.assertTrue(all(len(group) > 60 for group in groups.values()))
+
+        obj = AnalyzedString(id=ids[0], value="value 0")
+        occurrence = CharacterOccurrence(string_id=ids[0], code_point=ord("v"), count=1)
+        self.assertEqual(router.db_for_write(AnalyzedString, instance=obj), sharding.shard_for(ids[0]))
+        self.assertEqual(router.db_for_read(CharacterOccurrence, instance=occurrence), sharding.shard_for(ids[0]))
+
+    def test_shard_merge_keeps_order(self):
+        merged = sharding.merge([[1, 4, 7], [2, 3, 9], []], key=lambda n: n, limit=5)
+        self.assertEqual(list(merged), [1, 2, 3, 4, 7])
+
+
+    # ---------- Read replicas ----------
+    @override_settings(ANALYZER_READ_REPLICAS=["replica"])
+    def test_replica_routing_and_read_your_writes_pin(self):
+        self.assertEqual(router.db_for_read(AnalyzedString), "replica")
+        self.assertEqual(router.db_for_write(AnalyzedString), "default")
+
+        factory = RequestFactory()
+        reads = []
+
+        def view(request):
+            reads.append(router.db_for_read(AnalyzedString))
+            return HttpResponse(status=201 if request.method == "POST" else 200)
+        middleware = replicas.ReadYourWritesMiddleware(view)
+
+        response = middleware(factory.post(self.base_url))
+        until = response[replicas.PIN_HEADER]
+        self.assertEqual(response.cookies[replicas.PIN_COOKIE].value, until)
+        self.assertNotIn(replicas.PIN_HEADER, middleware(factory.get(self.base_url)))
+
+        middleware(factory.get(self.base_url, HTTP_X_PRIMARY_UNTIL=until))
+        factory.cookies[replicas.PIN_COOKIE] = until
+        middleware(factory.get(self.base_url))
+        factory.cookies.clear()
+        middleware(factory.get(self.base_url, HTTP_X_PRIMARY_UNTIL=str(float(until) + 3600)))  # forged
+        self.assertEqual(reads, ["default", "replica", "default", "default", "replica"])
+
+@skipUnless(len(settings.ANALYZER_SHARDS) > 1, "set ANALYZER_SHARDS to two or more aliases")
+class ShardedStorageTests(APITestCase):
+    """End-to-end checks against the databases named in ANALYZER_SHARDS."""
+    databases = "__all__"
+
+    def run_on_commit(self):
+        stack = ExitStack()
+        for alias in settings.ANALYZER_SHARDS:
+            stack.enter_context(self.captureOnCommitCallbacks(using=alias, execute=True))
+        return stack
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        lookup.resolutions.clear()
+        self.values = [f"sharded value {i}" for i in range(20)] + ["level", "noon"]
+        with self.run_on_commit():
+            AnalyzedString.objects.bulk_analyze(self.values[:10])
+            for value in self.values[10:]:
+                self.client.post(reverse("string-list-create"), {"value": value}, format="json")
+
+    def test_rows_stored_on_their_shard_only(self):
+        for value in self.values:
+            pk = compute_sha256(value)
+            holders = [alias for alias in settings.ANALYZER_SHARDS
+                       if AnalyzedString.objects.using(alias).filter(id=pk).exists()]
+            self.assertEqual(holders, [sharding.shard_for(pk)])
+            self.assertTrue(CharacterOccurrence.objects.using(holders[0]).filter(string_id=pk).exists())
+
+    def test_list_merges_shards_in_order(self):
+        url = reverse("string-list-create") + "?limit=7"
+        seen, count = [], None
+        while url:
+            data = self.client.get(url).data
+            count = data["count"]
+            seen.extend(item["id"] for item in data["results"])
+            url = data["next"]
+        stored = [obj for alias in settings.ANALYZER_SHARDS for obj in AnalyzedString.objects.using(alias)]
+        self.assertEqual(count, len(self.values))
+        self.assertEqual(seen, [obj.id for obj in sorted(stored, key=lambda obj: (obj.created_at, obj.id))])
+
+        response = self.client.get(reverse("string-list-create"), {"is_palindrome": "true"})
+        self.assertEqual({item["value"] for item in response.data["results"]}, {"level", "noon"})
+        self.assertEqual(self.client.get(reverse("stats")).data["total_strings"], len(self.values))
+
+    def test_fan_out_keeps_the_callers_context(self):
+        token = replicas.pinned_to_primary.set(True)
+        self.addCleanup(replicas.pinned_to_primary.reset, token)
+        # Outside a transaction, so the shards are queried from the pool threads
+        with patch.object(sharding, "_in_transaction", return_value=False):
+            pinned = sharding.fan_out(lambda alias: replicas.pinned_to_primary.get())
+        self.assertEqual(pinned, [True] * len(settings.ANALYZER_SHARDS))
+
+    def test_detail_and_delete_on_any_shard(self):
+        for value in ("level", "sharded value 3"):
+            url = reverse("detail_string", args=[value])
+            self.assertEqual(self.client.get(url).data["value"], value)
+            with self.run_on_commit():
+                self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse("stats")).data["total_strings"], len(self.values) - 2)
+
+    def test_anagrams_searches_every_shard(self):
+        response = self.client.get(reverse("anagrams", args=["value sharded 1"]))
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual([item["value"] for item in response.data["results"]], ["sharded value 1"])
+        response = self.client.get(reverse("string-list-create"), {"is_anagram_of": "EVLLE"})
+        self.assertEqual([item["value"] for item in response.data["results"]], ["level"])
+
+    def test_similar_searches_every_shard(self):
+        response = self.client.get(reverse("similar_strings", args=["sharded value 3"]), {"threshold": 0.85})
+        found = {item["value"] for item in response.data["results"]}
+        self.assertEqual(found, {f"sharded value {i}" for i in range(10) if i != 3})
+        self.assertGreater(len({sharding.shard_for(compute_sha256(value)) for value in found}), 1)
+
+
+@skipUnless(settings.ANALYZER_READ_REPLICAS, "set ANALYZER_READ_REPLICAS to separate databases")
+@override_settings(ANALYZER_CACHE_ENABLED=False)
+class ReadReplicaTests(APITestCase):
+    """
+    Runs against replica aliases that are separate, never-replicated
+    databases, i.e. replicas lagging forever: only pinned reads see new rows.
+    """
+    databases = "__all__"
+
+    def test_read_your_writes(self):
+        lookup.resolutions.clear()
+        response = self.client.post(reverse("string-list-create"), {"value": "fresh"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse("detail_string", args=["fresh"])
+
+        # The writer reads the primary (cookie), everyone else a replica
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse("string-list-create")).data["count"], 1)
+        other = self.client_class()
+        self.assertEqual(other.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(other.get(reverse("string-list-create")).data["count"], 0)
+
+        # Clients without cookies echo the header instead
+        pinned = other.get(url, HTTP_X_PRIMARY_UNTIL=response[replicas.PIN_HEADER])
+        self.assertEqual(pinned.status_code, status.HTTP_200_OK)
@@ -1,8 +1,14 @@
 from django.urls import path
-from .views import StringDetailView, NaturalLanguageFilterView, StringListCreateView
+from .views import StringDetailView, NaturalLanguageFilterView, StringListCreateView, CacheStatsView, StatsView, SimilarStringsView, AnagramsView, PendingStringsView
 
 urlpatterns = [
     path("strings/", StringListCreateView.as_view(), name="string-list-create"),
     path("strings/filter-by-natural-language", NaturalLanguageFilterView.as_view(), name="natlang_filter"),
+    path("cache-stats", CacheStatsView.as_view(), name="cache_stats"),
+    path("ingest/pending", PendingStringsView.as_view(), name="pending_strings"),
+    path("ingest/pending/<str:string_id>", PendingStringsView.as_view(), name="pending_string"),
+    path("strings/stats", StatsView.as_view(), name="stats"),
+    path("strings/<path:string_value>/similar", SimilarStringsView.as_view(), name="similar_strings"),
+    path("strings/<path:string_value>/anagrams", AnagramsView.as_view(), name="anagrams"),
     path("strings/<path:string_value>", StringDetailView.as_view(), name="detail_string"),
 ]
@@ -2,56 +2,322 @@ from rest_framework.views import APIView
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.exceptions import ParseError, NotFound
-from .models import AnalyzedString, compute_sha256
-from .serializers import AnalyzedStringSerializer, CreateAnalyzeSerializer
-from .filters import AnalyzedStringFilter
+from .models import AnalyzedString, anagram_key_of, compute_sha256
+from .serializers import AnalyzedStringSerializer, CreateAnalyzeSerializer, StringRowSerializer
+from .filters import AnalyzedStringFilter, InvalidFilters, compile_plan
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters as drf_filters
 from .natlang import parse_natural_language_query
-from django.db import IntegrityError
+from django.conf import settings
+from rest_framework.settings import api_settings
+from .parsers import NDJSONParser, PlainTextParser
+from . import engine
+from .pagination import KeysetPagination, ordering_key
+from . import lookup
+from . import cache as response_cache
+from . import counting, idempotency, ingest, replicas, sharding, similarity, stats
+from django.http import StreamingHttpResponse
+import json
+from datetime import datetime, timezone
 
 # Create your views here.
 
+STREAM_CHUNK_SIZE = 2000
+SIMILAR_DEFAULT_THRESHOLD = 0.8
+# Result limits of /similar and /anagrams
+RELATED_DEFAULT_LIMIT = 50
+RELATED_MAX_LIMIT = 1000
+
+
+def stream_ndjson(queryset, row_serializer):
+    """
+    Stream a queryset as NDJSON, one serialized string per line.
+    Rows are fetched with a server-side iterator (one per shard, merged in
+    order) so memory stays constant.
+    """
+    queryset = row_serializer.rows(queryset.order_by(*KeysetPagination.ordering))
+    rows = sharding.merge(
+        [queryset.using(alias).iterator(chunk_size=STREAM_CHUNK_SIZE) for alias in sharding.shards()],
+        ordering_key,
+    )
+    items = row_serializer.iter_serialize(rows)
+    lines = (json.dumps(item) + "\n" for item in items)
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+def wants_stream(request):
+    return request.query_params.get("stream", "").lower() == "true"
+
+
+def wants_approximate(request):
+    return request.query_params.get("approximate", "").lower() == "true"
+
+
+def invalid_filters_response(error):
+    if isinstance(error, InvalidFilters):
+        return Response({"detail": "Invalid query parameters", "errors": error.errors},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response({"detail": "Invalid query parameter values or types", "error": str(error)},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+def page_cache_key(request, plan, row_serializer, paginator):
+    """
+    Pages are cached by the canonical plan rather than the raw query string,
+    so the same filters reached through /strings/ or natural language share
+    entries.
+    """
+    return response_cache.list_key("page", {
+        "plan": plan.cache_params(),
+        "fields": [row_serializer.top_level, row_serializer.properties],
+        "limit": paginator.get_limit(request),
+        "cursor": request.query_params.get(paginator.cursor_query_param),
+        "approximate": wants_approximate(request),
+    })
+
+
+def page_data(request, paginator, page):
+    """Response body for a (possibly cached) page."""
+    data = {
+        "count": page["count"],
+        "next": paginator.link_to(request, page["next_cursor"]),
+        "results": page["results"],
+    }
+    if "count_is_estimate" in page:  # only when approximate=true was asked for
+        data["count_is_estimate"] = page["count_is_estimate"]
+    return data
+
+
+def plan_page(request, plan, row_serializer):
+    """
+    Run `plan` and return one keyset page as ({"count", "next", "results"}, cache status).
+    Rows are serialized with `row_serializer` (a StringRowSerializer).
+    """
+    paginator = KeysetPagination()
+    key = page_cache_key(request, plan, row_serializer, paginator)
+    use_cache = response_cache.enabled() and replicas.cached_reads_allowed()
+
+    page = response_cache.fetch(key) if use_cache else None
+    cache_status = "HIT"
+    if page is None:
+        cache_status = "MISS"
+        queryset = plan.apply(AnalyzedString.objects.all())
+        rows = paginator.paginate_queryset(row_serializer.rows(queryset), request)
+        approximate = wants_approximate(request)
+        count, is_estimate = counting.plan_count(plan, queryset, approximate)
+        page = {
+            "count": count,
+            "next_cursor": paginator.next_cursor,
+            "results": row_serializer.serialize(rows),
+        }
+        if approximate:
+            page["count_is_estimate"] = is_estimate
+        if use_cache:
+            response_cache.store(key, page)
+
+    return page_data(request, paginator, page), cache_status
+
+
+def applied_filters(query_params):
+    """
+    The filters_applied echo of GET /strings/.
+    Raises ValueError if an integer filter is not an integer.
+    """
+    filters_applied = {}
+    for k in ["is_palindrome", "min_length", "max_length", "word_count", "contains_character",
+              "min_char_count", "contains_all", "contains_any", "contains", "startswith", "endswith",
+              "is_anagram_of"]:
+        v = query_params.get(k)
+        if v is not None:
+            if k == "is_palindrome":
+                filters_applied[k] = v.lower() == "true"
+            elif k in ("min_length", "max_length", "word_count"):
+                filters_applied[k] = int(v)
+            else:
+                filters_applied[k] = v
+    for key, _, _, n in AnalyzedStringFilter.char_count_params(query_params):
+        filters_applied[key] = n
+    return filters_applied
+
+
+def bulk_create(items):
+    """
+    Batch create: analyze every item and insert the new ones in bulk.
+    Returns (data, status): 207 with a per-item created/duplicate/invalid
+    result, or 400 for an empty or oversized batch.
+    """
+    max_items = getattr(settings, "ANALYZER_BULK_MAX_ITEMS", 10000)
+    if not items:
+        return {"detail": "Batch must contain at least one item"}, status.HTTP_400_BAD_REQUEST
+    if len(items) > max_items:
+        return {"detail": f"Batch too large (max {max_items} items)"}, status.HTTP_400_BAD_REQUEST
+
+    # Accept bare strings or {"value": ...} objects
+    values = [item.get("value") if isinstance(item, dict) else item for item in items]
+    outcomes = AnalyzedString.objects.bulk_analyze(values)
+
+    results = []
+    totals = {"created": 0, "duplicate": 0, "invalid": 0}
+    for index, (outcome, item) in enumerate(outcomes):
+        totals[outcome] += 1
+        if outcome == "invalid":
+            results.append({"index": index, "status": outcome, "detail": item})
+        else:
+            results.append({"index": index, "status": outcome, "id": item.id})
+
+    data = {
+        "count": len(results),
+        "created": totals["created"],
+        "duplicates": totals["duplicate"],
+        "invalid": totals["invalid"],
+        "results": results,
+    }
+    return data, status.HTTP_207_MULTI_STATUS
+
+
+def create_string(value, properties=None, idempotency_key=None):
+    """
+    Create one string with a single insert-or-ignore statement (see
+    AnalyzedString.insert). Returns (data, status): 201 with the new string;
+    for an existing one 409, or 200 with the stored string when the request
+    carries an Idempotency-Key (422 if that key was used for another value).
+    """
+    obj = AnalyzedString(value=value)
+    if idempotency_key and not idempotency.claim(idempotency_key, compute_sha256(value)):
+        return ({"detail": f"{idempotency.HEADER} was already used with a different value"},
+                status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if obj.insert(properties):
+        return AnalyzedStringSerializer(obj).data, status.HTTP_201_CREATED
+    if idempotency_key:
+        existing = AnalyzedString.objects.for_id(obj.id, primary=True).filter(id=obj.id).first()
+        if existing is not None:
+            return AnalyzedStringSerializer(existing).data, status.HTTP_200_OK
+    return {"detail": "String already exists in the system"}, status.HTTP_409_CONFLICT
+
+
+def enqueue_string(value):
+    """
+    Async-ingest mode (see analyzer.ingest): queue a validated value for the
+    ingest worker. Returns (data, 202) with its id.
+    """
+    hash_id = compute_sha256(value)
+    ingest.enqueue(hash_id, value)
+    return {"id": hash_id, "status": "pending"}, status.HTTP_202_ACCEPTED
+
+
+def similar_data(string_value, query_params):
+    """
+    Near-duplicates of a stored string (by value or hash), or of the path
+    text itself when it is not stored. Returns (data, status): 200 with the
+    matches, most similar first, or 400 for a bad threshold or limit.
+    """
+    try:
+        threshold = float(query_params.get("threshold", SIMILAR_DEFAULT_THRESHOLD))
+        limit = int(query_params.get("limit", RELATED_DEFAULT_LIMIT))
+    except ValueError:
+        return {"detail": "Invalid query parameter values or types"}, status.HTTP_400_BAD_REQUEST
+    if not 0 < threshold <= 1:
+        return {"detail": "threshold must be in (0, 1]"}, status.HTTP_400_BAD_REQUEST
+    if not 1 <= limit <= RELATED_MAX_LIMIT:
+        return {"detail": f"limit must be between 1 and {RELATED_MAX_LIMIT}"}, status.HTTP_400_BAD_REQUEST
+
+    obj = lookup.get_by_value_or_hash(string_value)
+    value, exclude_id = (obj.value, obj.id) if obj else (string_value, None)
+    matches = similarity.similar_strings(value, threshold, limit, exclude_id=exclude_id)
+    results = []
+    for score, match in matches:
+        item = AnalyzedStringSerializer(match).data
+        item["similarity"] = round(score, 4)
+        results.append(item)
+    data = {"query": value, "threshold": threshold, "count": len(results), "results": results}
+    return data, status.HTTP_200_OK
+
+
+def anagram_data(string_value, query_params):
+    """
+    Stored anagrams of a stored string (by value or hash), or of the path
+    text itself when it is not stored, oldest first. Each shard answers
+    with one probe of the anagram_key index. Returns (data, status): 200,
+    or 400 for a bad limit or a value without letters or digits.
+    """
+    try:
+        limit = int(query_params.get("limit", RELATED_DEFAULT_LIMIT))
+    except ValueError:
+        return {"detail": "Invalid query parameter values or types"}, status.HTTP_400_BAD_REQUEST
+    if not 1 <= limit <= RELATED_MAX_LIMIT:
+        return {"detail": f"limit must be between 1 and {RELATED_MAX_LIMIT}"}, status.HTTP_400_BAD_REQUEST
+
+    obj = lookup.get_by_value_or_hash(string_value)
+    value, key = (obj.value, obj.anagram_key) if obj else (string_value, anagram_key_of(string_value))
+    if not key:
+        return {"detail": "Value has no letters or digits"}, status.HTTP_400_BAD_REQUEST
+
+    def shard_anagrams(alias):
+        queryset = AnalyzedString.objects.using(alias).filter(anagram_key=key)
+        if obj:
+            queryset = queryset.exclude(id=obj.id)
+        return queryset.count(), list(queryset.order_by(*KeysetPagination.ordering)[:limit])
+
+    per_shard = sharding.fan_out(shard_anagrams)
+    matches = sharding.merge([rows for _, rows in per_shard], ordering_key, limit)
+    data = {
+        "query": value,
+        "count": sum(count for count, _ in per_shard),
+        "results": AnalyzedStringSerializer(matches, many=True).data,
+    }
+    return data, status.HTTP_200_OK
+
+
 class StringListCreateView(APIView):
     """
     Handles:
       - POST /strings: create new analyzed string
       - GET /strings: list or filter analyzed strings
+
+    GET is keyset-paginated (see KeysetPagination); pass stream=true to
+    receive every matching row as NDJSON instead.
+
+    With ANALYZER_ASYNC_INGEST a single-string POST is queued and answered
+    with 202 instead (see analyzer.ingest).
+
+    POST also accepts a batch: a JSON list (of strings or {"value": ...}
+    objects) or an application/x-ndjson body with one item per line, and a
+    single text/plain body holding the whole string (large bodies are
+    analyzed as they are read, see PlainTextParser).
     """
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + [NDJSONParser, PlainTextParser]
 
     def get(self, request):
-        queryset = AnalyzedString.objects.all()
-        filterset = AnalyzedStringFilter(request.GET, queryset=queryset)
-        if not filterset.is_valid():
-            return Response({"detail": "Invalid query parameters", "errors": filterset.errors},
-                            status=status.HTTP_400_BAD_REQUEST)
-
-        filtered_qs = filterset.qs
-        serializer = AnalyzedStringSerializer(filtered_qs, many=True)
+        try:
+            plan = compile_plan(request.query_params)
+            row_serializer = StringRowSerializer.from_param(request.query_params.get("fields"))
+        except ValueError as e:
+            return invalid_filters_response(e)
 
         # Collect filters applied
-        filters_applied = {}
-        for k in ["is_palindrome", "min_length", "max_length", "word_count", "contains_character"]:
-            v = request.query_params.get(k)
-            if v is not None:
-                if k == "is_palindrome":
-                    filters_applied[k] = v.lower() == "true"
-                elif k in ("min_length", "max_length", "word_count"):
-                    try:
-                        filters_applied[k] = int(v)
-                    except ValueError:
-                        return Response({"detail": "Invalid query parameter type"}, status=status.HTTP_400_BAD_REQUEST)
-                else:
-                    filters_applied[k] = v
+        try:
+            filters_applied = applied_filters(request.query_params)
+        except ValueError:
+            return Response({"detail": "Invalid query parameter type"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if wants_stream(request):
+            return stream_ndjson(plan.apply(AnalyzedString.objects.all()), row_serializer)
 
+        page, cache_status = plan_page(request, plan, row_serializer)
         data = {
-            "count": filtered_qs.count(),
+            "count": page["count"],
+            "next": page["next"],
             "filters_applied": filters_applied,
-            "results": serializer.data,
+            "results": page["results"],
         }
-        return Response(data, status=status.HTTP_200_OK)
+        if "count_is_estimate" in page:
+            data["count_is_estimate"] = page["count_is_estimate"]
+        return Response(data, status=status.HTTP_200_OK, headers={"X-Cache": cache_status})
 
     def post(self, request):
+        if isinstance(request.data, list):
+            return self.post_many(request.data)
+
         value = request.data.get("value")
         if not isinstance(value, str):
             return Response(
@@ -66,24 +332,21 @@ class StringListCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        hash_id = compute_sha256(value)
-        if AnalyzedString.objects.filter(id=hash_id).exists():
-            return Response(
-                {"detail": "String already exists in the system"},
-                status=status.HTTP_409_CONFLICT,
-            )
+        if ingest.enabled():
+            data, status_code = enqueue_string(value)
+            return Response(data, status=status_code)
 
-        try:
-            obj = AnalyzedString(value=value)
-            obj.save()
-        except IntegrityError:
-            return Response(
-                {"detail": "String already exists in the system"},
-                status=status.HTTP_409_CONFLICT,
-            )
+        # Only PlainTextParser produces these; anything a client sent is ignored
+        properties = request.data.get("properties")
+        if not isinstance(properties, engine.Properties):
+            properties = None
 
-        ser = AnalyzedStringSerializer(obj)
-        return Response(ser.data, status=status.HTTP_201_CREATED)
+        data, status_code = create_string(value, properties, request.headers.get(idempotency.HEADER))
+        return Response(data, status=status_code)
+
+    def post_many(self, items):
+        data, status_code = bulk_create(items)
+        return Response(data, status=status_code)
 
 
 # 1. POST /strings
@@ -96,34 +359,102 @@ class StringCreateView(APIView):
         if not isinstance(value, str):
             return Response({"detail": "Invalid data type for 'value' (must be string)"}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
-        hash_id = compute_sha256(value)
-        if AnalyzedString.objects.filter(id=hash_id).exists():
-            return Response({"detail": "String already exists in the system"}, status=status.HTTP_409_CONFLICT)
+        data, status_code = create_string(value, idempotency_key=request.headers.get(idempotency.HEADER))
+        return Response(data, status=status_code)
+
+class CacheStatsView(APIView):
+    """GET /cache-stats: response cache hit/miss counters."""
+
+    def get(self, request):
+        return Response(response_cache.stats(), status=status.HTTP_200_OK)
+
+
+class StatsView(APIView):
+    """GET /strings/stats: aggregate statistics, read from the StatBucket summary table."""
+
+    def get(self, request):
+        return Response(stats.summary(), status=status.HTTP_200_OK)
+
+
+class SimilarStringsView(APIView):
+    """
+    GET /strings/{string_value}/similar?threshold=0.8&limit=50: stored
+    strings whose shingles are at least `threshold` Jaccard-similar, found
+    through the MinHash LSH index (see analyzer.similarity).
+    """
+
+    def get(self, request, string_value):
+        data, status_code = similar_data(string_value, request.query_params)
+        return Response(data, status=status_code)
+
+
+class PendingStringsView(APIView):
+    """
+    GET /ingest/pending: strings accepted in async-ingest mode that the
+    ingest worker has not stored yet, oldest first (up to `limit`).
+    GET /ingest/pending/{id}: "pending" or "stored" for one id, else 404.
+    Both answer 404 when async ingest is off.
+    """
+
+    def get(self, request, string_id=None):
+        if not ingest.enabled():
+            # Do not open (and create) a queue file that nothing writes to
+            return Response({"detail": "Async ingest is not enabled."}, status=status.HTTP_404_NOT_FOUND)
+        if string_id is not None:
+            return self.status_of(string_id)
         try:
-            obj = AnalyzedString(value=value)
-            obj.save()
-        except IntegrityError:
-            return Response({"detail": "String already exists in the system"}, status=status.HTTP_409_CONFLICT)
-        ser = AnalyzedStringSerializer(obj)
-        return Response(ser.data, status=status.HTTP_201_CREATED)
+            limit = int(request.query_params.get("limit", RELATED_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"detail": "Invalid query parameter values or types"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= RELATED_MAX_LIMIT:
+            return Response({"detail": f"limit must be between 1 and {RELATED_MAX_LIMIT}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        results = [
+            {"id": pk, "enqueued_at": datetime.fromtimestamp(enqueued_at, tz=timezone.utc).isoformat()}
+            for pk, enqueued_at in ingest.pending_ids(limit)
+        ]
+        return Response({"count": ingest.pending_count(), "results": results}, status=status.HTTP_200_OK)
+
+    def status_of(self, string_id):
+        if ingest.is_pending(string_id):
+            return Response({"id": string_id, "status": "pending"}, status=status.HTTP_200_OK)
+        if (lookup.SHA256_RE.fullmatch(string_id)
+                and AnalyzedString.objects.for_id(string_id, primary=True).filter(id=string_id).exists()):
+            return Response({"id": string_id, "status": "stored"}, status=status.HTTP_200_OK)
+        return Response({"detail": "Unknown id"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class AnagramsView(APIView):
+    """
+    GET /strings/{string_value}/anagrams?limit=50: stored strings with the
+    same letters and digits, ignoring case, spaces and punctuation.
+    """
+
+    def get(self, request, string_value):
+        data, status_code = anagram_data(string_value, request.query_params)
+        return Response(data, status=status_code)
+
 
 # 2. GET /strings/{string_value}
 class StringDetailView(APIView):
     def get_object_by_value_or_hash(self, string_value):
-        # Try to get by exact string value first
-        obj = AnalyzedString.objects.filter(value=string_value).first()
-        if obj:
-            return obj
+        # Exact value match first, then SHA256 hash - resolved in one query
+        return lookup.get_by_value_or_hash(string_value)
 
-        # Try to get by SHA256 hash 
-        obj = AnalyzedString.objects.filter(id=string_value).first()
-        if obj:
-            return obj
+    def get(self, request, string_value):
+        pk = lookup.known_id(string_value)
+        if pk is not None and response_cache.enabled():
+            return response_cache.cached_response(
+                response_cache.detail_key(pk), lambda: self.detail_response(string_value)
+            )
 
-        # Return None if not found
-        return None
+        response = self.detail_response(string_value)
+        if response.status_code == 200 and response_cache.enabled():
+            response_cache.store(response_cache.detail_key(response.data["id"]), response.data)
+        return response
 
-    def get(self, request, string_value):
+    def detail_response(self, string_value):
         obj = self.get_object_by_value_or_hash(string_value)
         if not obj:
             return Response(
@@ -184,6 +515,11 @@ class StringsListView(generics.ListAPIView):
 
 # 4. Natural Language filtering: GET /strings/filter-by-natural-language?query=...
 class NaturalLanguageFilterView(APIView):
+    """
+    Parses the query into filters and runs them through the same FilterPlan,
+    pagination, streaming and cache as GET /strings.
+    """
+
     def get(self, request):
         q = request.query_params.get("query")
         if not q:
@@ -193,33 +529,33 @@ class NaturalLanguageFilterView(APIView):
         except ValueError as e:
             return Response({"detail": "Unable to parse natural language query"}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            plan = compile_plan(parsed)
+        except ValueError:
+            return Response({"detail": "Unable to parse natural language query"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            row_serializer = StringRowSerializer.from_param(request.query_params.get("fields"))
+        except ValueError as e:
+            return invalid_filters_response(e)
+
         # detect conflicting filters (example)
-        if "min_length" in parsed and "max_length" in parsed and parsed["min_length"] > parsed["max_length"]:
+        if plan.has_conflict():
             return Response({"detail": "Query parsed but resulted in conflicting filters"}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
-        # Build queryset
-        qs = AnalyzedString.objects.all()
-        if parsed.get("is_palindrome") is True:
-            qs = qs.filter(is_palindrome=True)
-        if "word_count" in parsed:
-            qs = qs.filter(word_count=parsed["word_count"])
-        if "min_length" in parsed:
-            qs = qs.filter(length__gte=parsed["min_length"])
-        if "max_length" in parsed:
-            qs = qs.filter(length__lte=parsed["max_length"])
-        if "contains_character" in parsed:
-            ch = parsed["contains_character"]
-            if not isinstance(ch, str) or len(ch) != 1:
-                return Response({"detail": "Unable to parse natural language query (contains_character must be single char)"}, status=status.HTTP_400_BAD_REQUEST)
-            # prefer JSON key lookup if DB supports; otherwise fallback to value contains
-            qs = qs.filter(value__contains=ch)
-
-        serializer = AnalyzedStringSerializer(qs, many=True)
-        return Response({
-            "data": serializer.data,
-            "count": qs.count(),
+        if wants_stream(request):
+            return stream_ndjson(plan.apply(AnalyzedString.objects.all()), row_serializer)
+
+        page, cache_status = plan_page(request, plan, row_serializer)
+        data = {
+            "data": page["results"],
+            "count": page["count"],
+            "next": page["next"],
             "interpreted_query": {
                 "original": q,
                 "parsed_filters": parsed
             }
-        })
+        }
+        if "count_is_estimate" in page:
+            data["count_is_estimate"] = page["count_is_estimate"]
+        return Response(data, headers={"X-Cache": cache_status})
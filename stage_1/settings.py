@@ -53,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    "analyzer.replicas.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = 'stage_1.urls'
@@ -90,6 +91,52 @@ DATABASES = {
     }
 }
 
+# Hash-partitioned storage (see analyzer/sharding.py): the database aliases
+# strings are spread over by their sha256 id, e.g. ANALYZER_SHARDS=shard0,shard1.
+# Empty keeps everything in "default". Aliases not configured above get a copy
+# of "default" with "_<alias>" appended to the database name (e.g. one SQLite
+# file per shard); run `manage.py migrate --database <alias>` for each.
+ANALYZER_SHARDS = [alias for alias in os.getenv("ANALYZER_SHARDS", "").split(",") if alias]
+for _alias in ANALYZER_SHARDS:
+    DATABASES.setdefault(_alias, {**DATABASES["default"], "NAME": f"{DATABASES['default']['NAME']}_{_alias}"})
+
+# Read replicas (see analyzer/replicas.py): aliases that serve analyzer
+# reads, e.g. ANALYZER_READ_REPLICAS=replica1,replica2; writes go to "default".
+# A client is pinned to "default" for ANALYZER_READ_YOUR_WRITES_SECONDS after
+# its own write. Aliases not configured above get a copy of "default".
+ANALYZER_READ_REPLICAS = [alias for alias in os.getenv("ANALYZER_READ_REPLICAS", "").split(",") if alias]
+ANALYZER_READ_YOUR_WRITES_SECONDS = float(os.getenv("ANALYZER_READ_YOUR_WRITES_SECONDS", "5"))
+for _alias in ANALYZER_READ_REPLICAS:
+    DATABASES.setdefault(_alias, {**DATABASES["default"], "TEST": {"MIRROR": "default"}})
+
+DATABASE_ROUTERS = ["analyzer.sharding.ShardRouter", "analyzer.replicas.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The "analyzer" cache holds API responses. Pick the backend with
+# ANALYZER_CACHE_BACKEND (locmem, file, db); for "file" the location is a
+# directory, for "db" a table created with `manage.py createcachetable`.
+
+ANALYZER_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analyzer": {
+        "BACKEND": ANALYZER_CACHE_BACKENDS[os.getenv("ANALYZER_CACHE_BACKEND", "locmem")],
+        "LOCATION": os.getenv("ANALYZER_CACHE_LOCATION", "analyzer_cache"),
+        "TIMEOUT": int(os.getenv("ANALYZER_CACHE_TTL", "300")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("ANALYZER_CACHE_MAX_ENTRIES", "10000"))},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -139,4 +186,29 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 50,
-}
\ No newline at end of file
+}
+
+# String analyzer
+ANALYZER_BULK_MAX_ITEMS = int(os.getenv("ANALYZER_BULK_MAX_ITEMS", "10000"))
+ANALYZER_LOOKUP_CACHE_SIZE = int(os.getenv("ANALYZER_LOOKUP_CACHE_SIZE", "4096"))
+# text/plain bodies above this many bytes are analyzed while being read
+ANALYZER_STREAM_THRESHOLD = int(os.getenv("ANALYZER_STREAM_THRESHOLD", str(64 * 1024)))
+ANALYZER_MAX_TEXT_BYTES = int(os.getenv("ANALYZER_MAX_TEXT_BYTES", str(8 * 1024 * 1024)))
+# Serve the API with the async views (for ASGI servers)
+ANALYZER_ASYNC_VIEWS = os.getenv("ANALYZER_ASYNC_VIEWS", "False") == "True"
+# Where long strings and big batches are analyzed: inline, thread or process
+# (see analyzer/executor.py); smaller inputs are always analyzed inline
+ANALYZER_EXECUTOR = os.getenv("ANALYZER_EXECUTOR", "thread")
+ANALYZER_ANALYSIS_WORKERS = int(os.getenv("ANALYZER_ANALYSIS_WORKERS", "4"))
+ANALYZER_INLINE_MAX_LENGTH = int(os.getenv("ANALYZER_INLINE_MAX_LENGTH", "4096"))
+ANALYZER_OFFLOAD_MIN_BATCH = int(os.getenv("ANALYZER_OFFLOAD_MIN_BATCH", "256"))
+# Store new frequency maps packed in a binary column instead of JSON
+ANALYZER_COMPACT_FREQUENCY_MAP = os.getenv("ANALYZER_COMPACT_FREQUENCY_MAP", "False") == "True"
+ANALYZER_CACHE_ENABLED = os.getenv("ANALYZER_CACHE_ENABLED", "True") == "True"
+ANALYZER_CACHE_ALIAS = "analyzer"
+# How long an Idempotency-Key is remembered (see analyzer/idempotency.py)
+ANALYZER_IDEMPOTENCY_TTL = int(os.getenv("ANALYZER_IDEMPOTENCY_TTL", str(24 * 3600)))
+# Queue single-string POSTs for `manage.py ingest_worker` and answer 202
+# (see analyzer/ingest.py); the queue is a local SQLite file
+ANALYZER_ASYNC_INGEST = os.getenv("ANALYZER_ASYNC_INGEST", "False") == "True"
+ANALYZER_INGEST_QUEUE_PATH = os.getenv("ANALYZER_INGEST_QUEUE_PATH", str(BASE_DIR / "ingest_queue.sqlite3"))